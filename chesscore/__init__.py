@@ -0,0 +1,5 @@
+# headless chess core (no pygame) shared by the GUI and the AI
+from chesscore.bitboard import Position, START_FEN
+from chesscore.board import Board, Piece, Move
+from chesscore.engine import Engine
+from chesscore.players import Player, Human, AI
@@ -0,0 +1,84 @@
+# attack tables computed once at import so move generation never bounds checks
+# every table is indexed by square (x + 8 * y)
+from chesscore.bitboard import BOARD_SIZE
+
+KNIGHT_OFFSETS = ((-1, 2), (1, 2), (-1, -2), (1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1))
+KING_OFFSETS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+ROOK_DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+BISHOP_DIRECTIONS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+def OffsetTargets(square, offsets):
+    x, y = square & 7, square >> 3
+    return tuple((x + dx) + BOARD_SIZE * (y + dy) for dx, dy in offsets
+                 if 0 <= x + dx < BOARD_SIZE and 0 <= y + dy < BOARD_SIZE)
+
+def Ray(square, direction): # squares walking out from (not including) square until the edge
+    x, y = square & 7, square >> 3
+    dx, dy = direction
+    ray = []
+    x, y = x + dx, y + dy
+    while 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE:
+        ray.append(x + BOARD_SIZE * y)
+        x, y = x + dx, y + dy
+    return tuple(ray)
+
+def Mask(squares):
+    bitboard = 0
+    for square in squares:
+        bitboard |= 1 << square
+    return bitboard
+
+KNIGHT_TARGETS = [OffsetTargets(square, KNIGHT_OFFSETS) for square in range(64)]
+KING_TARGETS = [OffsetTargets(square, KING_OFFSETS) for square in range(64)]
+
+# rays per square per direction, empty rays dropped (e.g. no northward rays from the 8th rank)
+ROOK_RAYS = [tuple(ray for ray in (Ray(square, d) for d in ROOK_DIRECTIONS) if ray) for square in range(64)]
+BISHOP_RAYS = [tuple(ray for ray in (Ray(square, d) for d in BISHOP_DIRECTIONS) if ray) for square in range(64)]
+QUEEN_RAYS = [ROOK_RAYS[square] + BISHOP_RAYS[square] for square in range(64)]
+SLIDER_RAYS = {"r": ROOK_RAYS, "b": BISHOP_RAYS, "q": QUEEN_RAYS}
+
+# squares a pawn of each colour attacks (diagonally forward) from each square
+PAWN_ATTACKS = {
+    "w": [OffsetTargets(square, ((-1, 1), (1, 1))) if square < 56 else () for square in range(64)],
+    "b": [OffsetTargets(square, ((-1, -1), (1, -1))) if square >= 8 else () for square in range(64)],
+}
+
+# the same tables as bitboards for attack detection
+KNIGHT_ATTACKS = [Mask(targets) for targets in KNIGHT_TARGETS]
+KING_ATTACKS = [Mask(targets) for targets in KING_TARGETS]
+PAWN_ATTACK_MASKS = {colour: [Mask(targets) for targets in table] for colour, table in PAWN_ATTACKS.items()}
+
+# radiates out from the target square instead of generating every enemy move:
+# a knight/king/pawn attacks the square if the same piece standing on it would attack them back,
+# and a slider attacks it if it is the first piece met along a matching ray
+def IsSquareAttacked(position, square, byColour):
+    enemy = position.bitboards[byColour]
+    if KNIGHT_ATTACKS[square] & enemy["n"]:
+        return True
+    if PAWN_ATTACK_MASKS["b" if byColour == "w" else "w"][square] & enemy["p"]:
+        return True
+    if KING_ATTACKS[square] & enemy["k"]:
+        return True
+
+    squares = position.squares
+    queen = byColour + "q"
+    if enemy["r"] | enemy["q"]:
+        rook = byColour + "r"
+        for ray in ROOK_RAYS[square]:
+            for target in ray:
+                occupant = squares[target]
+                if occupant is not None:
+                    if occupant == rook or occupant == queen:
+                        return True
+                    break
+    if enemy["b"] | enemy["q"]:
+        bishop = byColour + "b"
+        for ray in BISHOP_RAYS[square]:
+            for target in ray:
+                occupant = squares[target]
+                if occupant is not None:
+                    if occupant == bishop or occupant == queen:
+                        return True
+                    break
+    return False
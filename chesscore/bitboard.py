@@ -0,0 +1,296 @@
+# 64-bit integer board representation
+# squares are numbered 0-63 as x + 8 * y (a1 = 0, h1 = 7, a8 = 56, h8 = 63)
+# so the GUI's (x, y) tuples convert with SquareIndex/SquarePosition
+from chesscore.zobrist import PIECE_KEYS, BLACK_TO_MOVE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS, ComputeKey
+from chesscore.pst import MIDDLEGAME_SCORES, ENDGAME_SCORES, PHASES
+
+BOARD_SIZE = 8
+COLOURS = ("w", "b")
+PIECE_TYPES = ("p", "n", "b", "r", "q", "k")
+
+# castling rights are a 4 bit mask
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+ALL_CASTLING_RIGHTS = 15
+CASTLING_CHARACTERS = {"K": WHITE_KINGSIDE, "Q": WHITE_QUEENSIDE, "k": BLACK_KINGSIDE, "q": BLACK_QUEENSIDE}
+FILES = "abcdefgh"
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# rights that survive a move from/to each square - moving a king or rook (or capturing a rook) loses them
+CASTLING_MASKS = [ALL_CASTLING_RIGHTS] * 64
+CASTLING_MASKS[0] &= ~WHITE_QUEENSIDE
+CASTLING_MASKS[7] &= ~WHITE_KINGSIDE
+CASTLING_MASKS[4] &= ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASKS[56] &= ~BLACK_QUEENSIDE
+CASTLING_MASKS[63] &= ~BLACK_KINGSIDE
+CASTLING_MASKS[60] &= ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+
+def SquareIndex(position):
+    return position[0] + BOARD_SIZE * position[1]
+
+def SquarePosition(square):
+    return (square & 7, square >> 3)
+
+def OnBoard(position):
+    return 0 <= position[0] < BOARD_SIZE and 0 <= position[1] < BOARD_SIZE
+
+def SquareName(square): # e.g. 12 -> "e2"
+    return FILES[square & 7] + str((square >> 3) + 1)
+
+def ParseSquare(name):
+    return FILES.index(name[0]) + BOARD_SIZE * (int(name[1]) - 1)
+
+def MoveToUci(move): # long algebraic e.g. "e2e4", "e7e8q"
+    fromSquare, toSquare, promotion = move
+    return SquareName(fromSquare) + SquareName(toSquare) + (promotion or "")
+
+def PopCount(bitboard):
+    return bin(bitboard).count("1")
+
+def LowestSquare(bitboard):
+    return (bitboard & -bitboard).bit_length() - 1 # isolate lowest set bit then find its index
+
+def CastlingRookSquares(kingFrom, kingTo):
+    if kingTo > kingFrom: # kingside
+        return kingFrom + 3, kingFrom + 1
+    return kingFrom - 4, kingFrom - 1 # queenside
+
+def IterateSquares(bitboard):
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+class Position:
+    def __init__(self):
+        # one bitboard per colour/piece type plus occupancy per colour
+        self.bitboards = {colour: {pieceType: 0 for pieceType in PIECE_TYPES} for colour in COLOURS}
+        self.occupancy = {"w": 0, "b": 0}
+        self.squares = [None] * 64 # piece codes e.g. "wp" so single square lookups stay O(1)
+        self.enPassantSquare = None
+        self.turn = "w"
+        self.castlingRights = 0
+        self.halfmoveClock = 0 # plies since the last capture or pawn move, for the fifty move rule
+        self.fullmoveNumber = 1 # starts at 1 and goes up after each black move
+        self.history = [] # undo records pushed by MakeMove and popped by UnmakeMove
+        self.key = 0 # Zobrist key, kept up to date by every change below
+        self.pawnKey = 0 # the same but for the pawns only, for the pawn structure table (see pawns.py)
+        # material + piece-square totals (centipawns, white's point of view) and the game phase (see pst.py), kept the same way
+        self.middlegameScore = 0
+        self.endgameScore = 0
+        self.phase = 0
+
+    @classmethod
+    def FromFen(cls, fen):
+        fields = fen.split()
+        ranks = fields[0].split("/") if fields else []
+        if len(ranks) != BOARD_SIZE:
+            raise ValueError(f"invalid FEN, expected 8 ranks: {fen!r}")
+
+        position = cls()
+        for rankIndex, rank in enumerate(ranks):
+            y = 7 - rankIndex # FEN starts from the 8th rank
+            x = 0
+            for character in rank:
+                if character.isdigit():
+                    x += int(character)
+                elif character.lower() in PIECE_TYPES and x < BOARD_SIZE:
+                    colour = "w" if character.isupper() else "b"
+                    position.AddPiece(colour + character.lower(), x + BOARD_SIZE * y)
+                    x += 1
+                else:
+                    raise ValueError(f"invalid FEN rank {rank!r}: {fen!r}")
+            if x != BOARD_SIZE:
+                raise ValueError(f"invalid FEN rank {rank!r}: {fen!r}")
+
+        for colour in COLOURS: # the rules code always expects to find each king
+            if position.Count(colour, "k") != 1:
+                raise ValueError(f"invalid FEN, expected one {'white' if colour == 'w' else 'black'} king: {fen!r}")
+
+        position.turn = fields[1] if len(fields) > 1 else "w"
+        if position.turn not in COLOURS:
+            raise ValueError(f"invalid FEN side to move {position.turn!r}: {fen!r}")
+        if len(fields) > 2:
+            if fields[2] != "-" and not all(character in CASTLING_CHARACTERS for character in fields[2]):
+                raise ValueError(f"invalid FEN castling rights {fields[2]!r}: {fen!r}")
+            for character in fields[2]:
+                position.castlingRights |= CASTLING_CHARACTERS.get(character, 0) # "-" adds nothing
+        if len(fields) > 3 and fields[3] != "-":
+            enPassant = fields[3]
+            if len(enPassant) != 2 or enPassant[0] not in FILES or enPassant[1] not in "36":
+                raise ValueError(f"invalid FEN en passant square {enPassant!r}: {fen!r}")
+            position.enPassantSquare = ParseSquare(enPassant)
+        try:
+            if len(fields) > 4:
+                position.halfmoveClock = int(fields[4])
+            if len(fields) > 5:
+                position.fullmoveNumber = int(fields[5])
+        except ValueError:
+            raise ValueError(f"invalid FEN move clocks: {fen!r}") from None
+        position.RefreshKey()
+        return position
+
+    def ToFen(self):
+        ranks = []
+        for y in range(BOARD_SIZE - 1, -1, -1): # 8th rank first
+            rank = ""
+            empty = 0
+            for x in range(BOARD_SIZE):
+                code = self.squares[x + BOARD_SIZE * y]
+                if code is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += code[1].upper() if code[0] == "w" else code[1]
+            ranks.append(rank + (str(empty) if empty else ""))
+
+        castling = "".join(character for character, right in CASTLING_CHARACTERS.items() if self.castlingRights & right) or "-"
+        enPassant = SquareName(self.enPassantSquare) if self.enPassantSquare is not None else "-"
+        return f"{'/'.join(ranks)} {self.turn} {castling} {enPassant} {self.halfmoveClock} {self.fullmoveNumber}"
+
+    def CopyStateFrom(self, other):
+        self.bitboards = {colour: dict(bitboards) for colour, bitboards in other.bitboards.items()}
+        self.occupancy = dict(other.occupancy)
+        self.squares = list(other.squares)
+        self.enPassantSquare = other.enPassantSquare
+        self.turn = other.turn
+        self.castlingRights = other.castlingRights
+        self.halfmoveClock = other.halfmoveClock
+        self.fullmoveNumber = other.fullmoveNumber
+        self.history = [] # a copy starts with nothing to undo
+        self.key = other.key
+        self.pawnKey = other.pawnKey
+        self.middlegameScore = other.middlegameScore
+        self.endgameScore = other.endgameScore
+        self.phase = other.phase
+
+    def CopyPosition(self): # plain Position with no GUI state, used as the search board
+        position = Position()
+        position.CopyStateFrom(self)
+        return position
+
+    def RefreshKey(self): # call after setting turn/castling/en passant directly instead of through MakeMove
+        self.key = ComputeKey(self)
+
+    def AddPiece(self, code, square):
+        colour, pieceType = code
+        bit = 1 << square
+        self.bitboards[colour][pieceType] |= bit
+        self.occupancy[colour] |= bit
+        self.squares[square] = code
+        self.key ^= PIECE_KEYS[code][square]
+        if pieceType == "p":
+            self.pawnKey ^= PIECE_KEYS[code][square]
+        self.middlegameScore += MIDDLEGAME_SCORES[code][square]
+        self.endgameScore += ENDGAME_SCORES[code][square]
+        self.phase += PHASES[code]
+
+    def ClearSquare(self, square):
+        code = self.squares[square]
+        if code is not None:
+            colour, pieceType = code
+            mask = ~(1 << square)
+            self.bitboards[colour][pieceType] &= mask
+            self.occupancy[colour] &= mask
+            self.squares[square] = None
+            self.key ^= PIECE_KEYS[code][square]
+            if pieceType == "p":
+                self.pawnKey ^= PIECE_KEYS[code][square]
+            self.middlegameScore -= MIDDLEGAME_SCORES[code][square]
+            self.endgameScore -= ENDGAME_SCORES[code][square]
+            self.phase -= PHASES[code]
+        return code
+
+    def PieceAt(self, square):
+        return self.squares[square]
+
+    def Occupied(self):
+        return self.occupancy["w"] | self.occupancy["b"]
+
+    def PieceSquares(self, colour, pieceType=None):
+        bitboard = self.occupancy[colour] if pieceType is None else self.bitboards[colour][pieceType]
+        return list(IterateSquares(bitboard))
+
+    def KingSquare(self, colour):
+        king = self.bitboards[colour]["k"]
+        return LowestSquare(king) if king else None
+
+    def Count(self, colour, pieceType):
+        return PopCount(self.bitboards[colour][pieceType])
+
+    # moves are (fromSquare, toSquare, promotion) tuples, promotion being None or a piece type
+    def MakeMove(self, move):
+        fromSquare, toSquare, promotion = move
+        code = self.squares[fromSquare]
+        colour, pieceType = code
+        previousKey = self.key
+
+        capturedSquare = toSquare
+        if pieceType == "p" and toSquare == self.enPassantSquare: # en passant - captured pawn is behind the end square
+            capturedSquare = toSquare - 8 if colour == "w" else toSquare + 8
+        captured = self.ClearSquare(capturedSquare)
+
+        # undo record: everything MakeMove changes that cannot be worked out from the move itself
+        self.history.append((move, code, captured, capturedSquare, self.enPassantSquare, self.castlingRights, previousKey, self.halfmoveClock))
+
+        self.ClearSquare(fromSquare)
+        self.AddPiece(colour + promotion if promotion else code, toSquare)
+
+        if pieceType == "k" and abs(toSquare - fromSquare) == 2: # castling - move the rook too
+            rookFrom, rookTo = CastlingRookSquares(fromSquare, toSquare)
+            self.AddPiece(self.ClearSquare(rookFrom), rookTo)
+
+        # pieces were XORed in/out by ClearSquare/AddPiece, now the rest of the key
+        key = self.key ^ BLACK_TO_MOVE_KEY
+        if self.enPassantSquare is not None:
+            key ^= EN_PASSANT_KEYS[self.enPassantSquare & 7]
+        self.enPassantSquare = None
+        if pieceType == "p" and abs(toSquare - fromSquare) == 16: # double pawn move
+            self.enPassantSquare = (fromSquare + toSquare) // 2
+            key ^= EN_PASSANT_KEYS[fromSquare & 7]
+        castlingRights = self.castlingRights & CASTLING_MASKS[fromSquare] & CASTLING_MASKS[toSquare]
+        if castlingRights != self.castlingRights:
+            key ^= CASTLING_KEYS[self.castlingRights] ^ CASTLING_KEYS[castlingRights]
+            self.castlingRights = castlingRights
+        self.key = key
+        self.halfmoveClock = 0 if pieceType == "p" or captured is not None else self.halfmoveClock + 1
+        if colour == "b":
+            self.fullmoveNumber += 1
+        self.turn = "b" if colour == "w" else "w"
+
+    # pass the turn without moving - only for null move pruning, it is never a legal move
+    # the undo record has no move in it so UnmakeNullMove can restore the rest
+    def MakeNullMove(self):
+        self.history.append((None, None, None, None, self.enPassantSquare, self.castlingRights, self.key, self.halfmoveClock))
+        self.key ^= BLACK_TO_MOVE_KEY
+        if self.enPassantSquare is not None:
+            self.key ^= EN_PASSANT_KEYS[self.enPassantSquare & 7]
+            self.enPassantSquare = None
+        self.halfmoveClock += 1
+        self.turn = "b" if self.turn == "w" else "w"
+
+    def UnmakeNullMove(self):
+        _, _, _, _, self.enPassantSquare, _, self.key, self.halfmoveClock = self.history.pop()
+        self.turn = "b" if self.turn == "w" else "w"
+
+    def UnmakeMove(self):
+        move, code, captured, capturedSquare, enPassantSquare, castlingRights, key, halfmoveClock = self.history.pop()
+        fromSquare, toSquare, promotion = move
+
+        self.ClearSquare(toSquare)
+        self.AddPiece(code, fromSquare) # original code, so promotions turn back into pawns
+        if captured is not None:
+            self.AddPiece(captured, capturedSquare)
+
+        if code[1] == "k" and abs(toSquare - fromSquare) == 2:
+            rookFrom, rookTo = CastlingRookSquares(fromSquare, toSquare)
+            self.AddPiece(self.ClearSquare(rookTo), rookFrom)
+
+        self.enPassantSquare = enPassantSquare
+        self.castlingRights = castlingRights
+        self.key = key # cheaper to restore than to XOR everything back out
+        self.halfmoveClock = halfmoveClock
+        if code[0] == "b":
+            self.fullmoveNumber -= 1
+        self.turn = code[0]
@@ -0,0 +1,124 @@
+# Position plus Piece objects, for code that works with pieces rather than squares (e.g. the GUI)
+from chesscore.bitboard import Position, SquareIndex, SquarePosition, OnBoard, IterateSquares, CastlingRookSquares
+
+class Move: # GUI move log entry - the undo information itself lives in the board's undo records
+    def __init__(self, startSquare, endSquare, board, promotion=None):
+        self.startRow, self.startCol = startSquare
+        self.endRow, self.endCol = endSquare
+        self.pieceMoved = board.GetPieceAt(startSquare)
+
+        # need to determine captured piece for en passant (the captured pawn is NOT on the end square)
+        self.isEnPassant = False
+        if self.pieceMoved and self.pieceMoved.type == "p" and SquareIndex(endSquare) == board.enPassantSquare: # conditions for detecting en passant
+            self.isEnPassant = True
+            direction = 1 if self.pieceMoved.colour == "w" else -1 # inverse directions relative to colour
+            capturedPosition = (endSquare[0], endSquare[1] - direction)
+            self.pieceCaptured = board.GetPieceAt(capturedPosition)
+        else: # if theres no en passant just log the enemy piece on the destination/end square
+            self.pieceCaptured = board.GetPieceAt(endSquare)
+
+        # check for castling
+        self.isCastling = self.pieceMoved is not None and self.pieceMoved.type == "k" and abs(startSquare[0] - endSquare[0]) == 2
+
+        # flag for pawn promotion - humans always promote to a queen
+        if promotion is None and self.pieceMoved and self.pieceMoved.type == "p" and endSquare[1] in (0, 7):
+            promotion = "q"
+        self.promoted = promotion is not None
+
+        # the move in the form Board.MakeMove/UnmakeMove use
+        self.move = (SquareIndex(startSquare), SquareIndex(endSquare), promotion)
+
+class Piece:
+    def __init__(self, data, position):
+        self.colour = data[0]
+        self.type = data[1]
+        self.position = position
+        self.moved = False
+        self.castled = False
+
+    def Promote(self, pieceType="q"):
+        self.type = pieceType
+
+class Board(Position): # bitboards live in Position, Piece objects are kept alongside them
+    def __init__(self):
+        super().__init__()
+        self.pieces = [None] * 64 # Piece objects indexed by square, same as Position.squares
+        self.pieceHistory = [] # Piece-level undo records, one per Position undo record
+
+    @classmethod
+    def FromFen(cls, fen):
+        board = cls()
+        board.SetFen(fen)
+        return board
+
+    def SetFen(self, fen): # resets this board in place, so the GUI and engine can keep their references to it
+        self.CopyStateFrom(Position.FromFen(fen))
+        self.pieces = [None] * 64
+        self.pieceHistory = []
+        for square in IterateSquares(self.Occupied()):
+            self.pieces[square] = Piece(self.squares[square], SquarePosition(square))
+
+    def PlacePiece(self, piece):
+        square = SquareIndex(piece.position)
+        self.ClearSquare(square) # overwrite anything already there
+        self.AddPiece(piece.colour + piece.type, square)
+        self.pieces[square] = piece
+
+    # make/unmake on the bitboards, then keep the Piece objects in step
+    def MakeMove(self, move):
+        fromSquare, toSquare, promotion = move
+        piece = self.pieces[fromSquare]
+        super().MakeMove(move)
+
+        capturedSquare = self.history[-1][3]
+        capturedPiece = self.pieces[capturedSquare]
+        self.pieces[capturedSquare] = None
+        self.pieces[fromSquare] = None
+        self.pieces[toSquare] = piece
+        piece.position = SquarePosition(toSquare)
+
+        rook, rookWasMoved = None, None
+        if piece.type == "k" and abs(toSquare - fromSquare) == 2:
+            rookFrom, rookTo = CastlingRookSquares(fromSquare, toSquare)
+            rook = self.pieces[rookFrom]
+            rookWasMoved = rook.moved
+            self.pieces[rookFrom] = None
+            self.pieces[rookTo] = rook
+            rook.position = SquarePosition(rookTo)
+            rook.moved = True
+
+        self.pieceHistory.append((capturedPiece, piece.moved, rook, rookWasMoved))
+        piece.moved = True
+        if promotion:
+            piece.Promote(promotion)
+
+    def UnmakeMove(self):
+        (fromSquare, toSquare, promotion), _, _, capturedSquare = self.history[-1][:4]
+        super().UnmakeMove()
+        capturedPiece, pieceWasMoved, rook, rookWasMoved = self.pieceHistory.pop()
+
+        piece = self.pieces[toSquare]
+        self.pieces[toSquare] = None
+        self.pieces[fromSquare] = piece
+        piece.position = SquarePosition(fromSquare)
+        piece.moved = pieceWasMoved
+        if promotion:
+            piece.type = "p"
+        if capturedPiece is not None:
+            self.pieces[capturedSquare] = capturedPiece
+
+        if rook is not None:
+            rookFrom, rookTo = CastlingRookSquares(fromSquare, toSquare)
+            self.pieces[rookTo] = None
+            self.pieces[rookFrom] = rook
+            rook.position = SquarePosition(rookFrom)
+            rook.moved = rookWasMoved
+
+    # compatibility shims for the GUI - both are backed by the bitboards
+    def GetPieceAt(self, position):
+        if not OnBoard(position):
+            return None
+        return self.pieces[SquareIndex(position)]
+    
+    def GetPieces(self, colour):
+        return [self.pieces[square] for square in IterateSquares(self.occupancy[colour])]
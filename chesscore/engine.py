@@ -0,0 +1,71 @@
+# rules queries and static evaluation
+from chesscore.bitboard import SquareIndex, SquarePosition, PopCount
+from chesscore.movegen import LegalMoves, IsLegalMove
+from chesscore.attacks import IsSquareAttacked
+from chesscore.pst import MAX_PHASE
+from chesscore.pawns import PawnHashTable
+
+class Engine:
+    def __init__(self, board):
+        self.board = board
+        self.pieceValues = {"p": 1, "n": 3.2, "b": 3.3, "r": 5, "q": 9, "k": 20}
+        self.pawnTable = PawnHashTable()
+    
+    def HashBoard(self, board): # incremental Zobrist key, includes side to move, castling rights and en passant
+        return board.key
+
+    def FindKingPosition(self, colour, board):
+        square = board.KingSquare(colour)
+        return SquarePosition(square) if square is not None else None
+
+    def IsCheck(self, colour, board):
+        enemyColour = "w" if colour == "b" else "b"
+        return self.IsSquareAttacked(board.KingSquare(colour), enemyColour, board) # if king attacked by enemy
+    
+    def IsSquareAttacked(self, square, enemyColour, board): # different board state
+        return IsSquareAttacked(board, square, enemyColour)
+
+    # legal moves as (fromSquare, toSquare, promotion) tuples
+    def GetLegalMoves(self, colour, board):
+        return LegalMoves(board, colour)
+
+    def GetTacticalMoves(self, colour, board): # legal captures and promotions only
+        return LegalMoves(board, colour, tacticalOnly=True)
+
+    def GetQuietMoves(self, colour, board): # everything GetTacticalMoves leaves out
+        return LegalMoves(board, colour, quietOnly=True)
+
+    def IsLegalMove(self, move, board):
+        return IsLegalMove(board, move)
+
+    def LegalMovesFrom(self, square, board):
+        return [move for move in LegalMoves(board, board.squares[square][0]) if move[0] == square]
+
+    def CalculateLegalMoves(self, piece, board): # (x, y) destinations for the GUI, which always promotes to a queen
+        moves = self.LegalMovesFrom(SquareIndex(piece.position), board)
+        return [SquarePosition(toSquare) for _, toSquare, promotion in moves if promotion in (None, "q")]
+    
+    def HasLegalMove(self, colour, board):
+        return len(LegalMoves(board, colour)) > 0
+
+    def IsCheckmate(self, colour, board):
+        return self.IsCheck(colour, board) and not self.HasLegalMove(colour, board)
+
+    def IsStalemate(self, colour, board):
+        return not self.IsCheck(colour, board) and not self.HasLegalMove(colour, board)
+        
+    def IsDraw(self, board): # cba for other cases for now so its going to be draw IIF 2 kings on the board
+        # if there are exactly 2 pieces and both are kings, thats a draw.
+        if PopCount(board.Occupied()) == 2 and board.Count("w", "k") == 1 and board.Count("b", "k") == 1:
+            return True
+
+    # from white's point of view - white maximises, black minimises
+    def Evaluate(self, board):
+        # material and piece-square totals are kept up to date by the board, pawn structure comes from the pawn
+        # table, and the two halves are blended by how much material is left
+        # (promotions can push the phase past the starting total, that still counts as full middlegame)
+        pawnMiddlegame, pawnEndgame = self.pawnTable.Probe(board)
+        phase = min(board.phase, MAX_PHASE)
+        middlegame = board.middlegameScore + pawnMiddlegame
+        endgame = board.endgameScore + pawnEndgame
+        return (middlegame * phase + endgame * (MAX_PHASE - phase)) / (100 * MAX_PHASE) # centipawns to pawns
@@ -0,0 +1,186 @@
+# pseudo-legal move generation on a Position
+# moves are (fromSquare, toSquare, promotion) tuples, see Position.MakeMove
+from chesscore.bitboard import WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE, IterateSquares
+from chesscore.attacks import (KNIGHT_TARGETS, KING_TARGETS, SLIDER_RAYS, PAWN_ATTACKS, ROOK_RAYS, BISHOP_RAYS,
+                               KNIGHT_ATTACKS, PAWN_ATTACK_MASKS, IsSquareAttacked)
+
+PROMOTION_TYPES = ("q", "r", "b", "n")
+
+# (right, king square, squares that must be empty, rook square) for each castle
+CASTLES = {
+    "w": ((WHITE_KINGSIDE, 4, (5, 6), 7), (WHITE_QUEENSIDE, 4, (1, 2, 3), 0)),
+    "b": ((BLACK_KINGSIDE, 60, (61, 62), 63), (BLACK_QUEENSIDE, 60, (57, 58, 59), 56)),
+}
+
+def PseudoLegalMoves(position, square):
+    colour, pieceType = position.squares[square]
+    squares = position.squares
+    moves = []
+
+    if pieceType == "p":
+        direction = 8 if colour == "w" else -8 # one rank forward in square numbers
+        startRank = 1 if colour == "w" else 6
+        promotionRank = 7 if colour == "w" else 0
+        targets = []
+        forward = square + direction
+        if squares[forward] is None:
+            targets.append(forward)
+            # double pawn move
+            if square >> 3 == startRank and squares[forward + direction] is None:
+                targets.append(forward + direction)
+
+        for target in PAWN_ATTACKS[colour][square]: # diagonal captures, including en passant
+            enemy = squares[target]
+            if (enemy is not None and enemy[0] != colour) or (target == position.enPassantSquare and colour == position.turn):
+                targets.append(target)
+
+        for target in targets:
+            if target >> 3 == promotionRank:
+                moves.extend((square, target, promotion) for promotion in PROMOTION_TYPES)
+            else:
+                moves.append((square, target, None))
+
+    elif pieceType == "n" or pieceType == "k":
+        for target in (KNIGHT_TARGETS if pieceType == "n" else KING_TARGETS)[square]:
+            occupant = squares[target]
+            if occupant is None or occupant[0] != colour: # if square empty or has enemy piece
+                moves.append((square, target, None))
+
+        if pieceType == "k":
+            # castling - rights already cover the king and rook having moved, but check the rook is really there
+            for right, kingSquare, between, rookSquare in CASTLES[colour]:
+                if (position.castlingRights & right and square == kingSquare and squares[rookSquare] == colour + "r"
+                        and all(squares[s] is None for s in between)):
+                    moves.append((square, kingSquare + (2 if rookSquare > kingSquare else -2), None))
+
+    else:
+        moves.extend(SlidingMoves(position, square, colour, SLIDER_RAYS[pieceType][square]))
+
+    return moves
+
+def SlidingMoves(position, square, colour, rays):
+    squares = position.squares
+    moves = []
+    for ray in rays:
+        for target in ray: # walk out until the first blocker
+            occupant = squares[target]
+            if occupant is None:
+                moves.append((square, target, None))
+            else:
+                if occupant[0] != colour:
+                    moves.append((square, target, None))
+                break
+    return moves
+
+# full legal move list for one side, worked out from the king's checkers and pinned pieces
+# so no move has to be made and unmade to see if it leaves the king in check
+# tacticalOnly keeps just captures and promotions (for quiescence search), quietOnly just the rest
+def LegalMoves(position, colour=None, tacticalOnly=False, quietOnly=False):
+    if colour is None:
+        colour = position.turn
+    enemyColour = "b" if colour == "w" else "w"
+    squares = position.squares
+    enemy = position.bitboards[enemyColour]
+    kingSquare = position.KingSquare(colour)
+
+    # checkers as a bitboard, and the squares a non-king move must land on to answer a single check
+    checkers = (KNIGHT_ATTACKS[kingSquare] & enemy["n"]) | (PAWN_ATTACK_MASKS[colour][kingSquare] & enemy["p"])
+    evasionMask = checkers
+    pins = {} # pinned square: bitboard of the ray it may still move along (including capturing the pinner)
+    for rays, sliders in ((ROOK_RAYS[kingSquare], (enemyColour + "r", enemyColour + "q")),
+                          (BISHOP_RAYS[kingSquare], (enemyColour + "b", enemyColour + "q"))):
+        for ray in rays:
+            rayMask = 0
+            pinned = None
+            for target in ray:
+                rayMask |= 1 << target
+                occupant = squares[target]
+                if occupant is None:
+                    continue
+                if occupant[0] == colour:
+                    if pinned is not None: # two of our own pieces in the way - nothing pinned
+                        break
+                    pinned = target
+                    continue
+                if occupant in sliders:
+                    if pinned is None:
+                        checkers |= 1 << target
+                        evasionMask |= rayMask # capture the checker or block anywhere in between
+                    else:
+                        pins[pinned] = rayMask
+                break
+
+    moves = []
+    # king moves - take the king off the board so sliders see through the square it is leaving
+    king = squares[kingSquare]
+    squares[kingSquare] = None
+    for target in KING_TARGETS[kingSquare]:
+        occupant = squares[target]
+        if (tacticalOnly and occupant is None) or (quietOnly and occupant is not None):
+            continue
+        if (occupant is None or occupant[0] != colour) and not IsSquareAttacked(position, target, enemyColour):
+            moves.append((kingSquare, target, None))
+    squares[kingSquare] = king
+
+    if checkers:
+        if checkers & (checkers - 1): # double check - only the king can move
+            return moves
+    elif not tacticalOnly:
+        # castling - not out of, through or into check
+        for right, castleSquare, between, rookSquare in CASTLES[colour]:
+            if (position.castlingRights & right and kingSquare == castleSquare and squares[rookSquare] == colour + "r"
+                    and all(squares[s] is None for s in between)):
+                step = 1 if rookSquare > kingSquare else -1
+                if (not IsSquareAttacked(position, kingSquare + step, enemyColour)
+                        and not IsSquareAttacked(position, kingSquare + 2 * step, enemyColour)):
+                    moves.append((kingSquare, kingSquare + 2 * step, None))
+
+    enPassantSquare = position.enPassantSquare if colour == position.turn else None
+    for square in IterateSquares(position.occupancy[colour] ^ (1 << kingSquare)):
+        pinMask = pins.get(square)
+        for move in PseudoLegalMoves(position, square):
+            target = move[1]
+            if target == enPassantSquare and squares[square][1] == "p":
+                # en passant removes two pawns from one rank, so just try it on the bitboards
+                if not quietOnly and EnPassantIsLegal(position, move, kingSquare, enemyColour):
+                    moves.append(move)
+                continue
+            isQuiet = squares[target] is None and move[2] is None
+            if (tacticalOnly and isQuiet) or (quietOnly and not isQuiet):
+                continue
+            bit = 1 << target
+            if checkers and not bit & evasionMask:
+                continue
+            if pinMask is not None and not bit & pinMask:
+                continue
+            moves.append(move)
+    return moves
+
+# legality of a single move (e.g. a hash move) without generating the whole move list
+def IsLegalMove(position, move):
+    fromSquare, toSquare, _ = move
+    code = position.squares[fromSquare]
+    if code is None or code[0] != position.turn or move not in PseudoLegalMoves(position, fromSquare):
+        return False
+    colour = code[0]
+    enemyColour = "b" if colour == "w" else "w"
+    if code[1] == "k" and abs(toSquare - fromSquare) == 2: # castling - not out of or through check either
+        step = 1 if toSquare > fromSquare else -1
+        if IsSquareAttacked(position, fromSquare, enemyColour) or IsSquareAttacked(position, fromSquare + step, enemyColour):
+            return False
+    position.MakeMove(move)
+    legal = not IsSquareAttacked(position, position.KingSquare(colour), enemyColour)
+    position.UnmakeMove()
+    return legal
+
+def EnPassantIsLegal(position, move, kingSquare, enemyColour):
+    fromSquare, toSquare, _ = move
+    capturedSquare = toSquare - 8 if enemyColour == "b" else toSquare + 8
+    captured = position.ClearSquare(capturedSquare)
+    pawn = position.ClearSquare(fromSquare)
+    position.AddPiece(pawn, toSquare)
+    legal = not IsSquareAttacked(position, kingSquare, enemyColour)
+    position.ClearSquare(toSquare)
+    position.AddPiece(pawn, fromSquare)
+    position.AddPiece(captured, capturedSquare)
+    return legal
@@ -0,0 +1,91 @@
+# pawn structure evaluation - passed, isolated, doubled and backward pawns and how far each pawn has to go
+# it only depends on where the pawns are, which rarely changes between neighbouring positions in the search,
+# so results are cached in a table indexed by the board's pawn-only Zobrist key (Position.pawnKey)
+# scores are (middlegame, endgame) centipawns from white's point of view, blended by Engine.Evaluate like the
+# piece-square totals
+import math
+from chesscore.bitboard import IterateSquares, PopCount
+from chesscore.attacks import Mask, PAWN_ATTACK_MASKS
+
+PAWN_TABLE_SIZE = 16384 # entries, must be a power of two
+
+DOUBLED_PENALTY = (10, 20) # (middlegame, endgame) per pawn in front of another on the same file
+ISOLATED_PENALTY = (10, 15) # no friendly pawns on either neighbouring file
+BACKWARD_PENALTY = (8, 10) # can't be supported by a pawn and can't safely step up to be level with one
+# by rank counted from the pawn's own side, so index 6 is about to promote
+PASSED_BONUS_MIDDLEGAME = (0, 5, 10, 15, 25, 40, 60, 0)
+PASSED_BONUS_ENDGAME = (0, 10, 20, 35, 55, 85, 120, 0)
+# diminishing bonus for every pawn by ranks left to the end - pushing pawns only helps to an extent
+PROMOTION_DISTANCE_BONUS = [5 * math.log(9 - distance) for distance in range(8)]
+
+FILE_MASKS = [Mask(range(file, 64, 8)) for file in range(8)]
+ADJACENT_FILE_MASKS = [(FILE_MASKS[file - 1] if file > 0 else 0) | (FILE_MASKS[file + 1] if file < 7 else 0)
+                       for file in range(8)]
+
+def RanksMask(ranks):
+    return Mask(square for square in range(64) if square >> 3 in ranks)
+
+# for each colour and square:
+#   passed - squares on this and the neighbouring files in front, which have to be free of enemy pawns
+#   support - neighbouring files level with or behind, where a friendly pawn could defend this one
+PASSED_MASKS = {
+    "w": [(FILE_MASKS[square & 7] | ADJACENT_FILE_MASKS[square & 7]) & RanksMask(range((square >> 3) + 1, 8)) for square in range(64)],
+    "b": [(FILE_MASKS[square & 7] | ADJACENT_FILE_MASKS[square & 7]) & RanksMask(range(0, square >> 3)) for square in range(64)],
+}
+SUPPORT_MASKS = {
+    "w": [ADJACENT_FILE_MASKS[square & 7] & RanksMask(range(0, (square >> 3) + 1)) for square in range(64)],
+    "b": [ADJACENT_FILE_MASKS[square & 7] & RanksMask(range(square >> 3, 8)) for square in range(64)],
+}
+
+def EvaluatePawns(position): # (middlegame, endgame) - the slow path, only run when the table misses
+    middlegame = endgame = 0
+    for colour, sign in (("w", 1), ("b", -1)):
+        enemyColour = "b" if colour == "w" else "w"
+        pawns = position.bitboards[colour]["p"]
+        enemyPawns = position.bitboards[enemyColour]["p"]
+        for square in IterateSquares(pawns):
+            file = square & 7
+            rank = square >> 3 if colour == "w" else 7 - (square >> 3)
+            mg = eg = PROMOTION_DISTANCE_BONUS[7 - rank]
+            if not enemyPawns & PASSED_MASKS[colour][square]:
+                mg += PASSED_BONUS_MIDDLEGAME[rank]
+                eg += PASSED_BONUS_ENDGAME[rank]
+            if not pawns & ADJACENT_FILE_MASKS[file]:
+                mg -= ISOLATED_PENALTY[0]
+                eg -= ISOLATED_PENALTY[1]
+            elif not pawns & SUPPORT_MASKS[colour][square] and rank < 6:
+                stopSquare = square + 8 if colour == "w" else square - 8
+                if enemyPawns & PAWN_ATTACK_MASKS[colour][stopSquare]: # its next square is covered by an enemy pawn
+                    mg -= BACKWARD_PENALTY[0]
+                    eg -= BACKWARD_PENALTY[1]
+            middlegame += sign * mg
+            endgame += sign * eg
+        for fileMask in FILE_MASKS:
+            count = PopCount(pawns & fileMask)
+            if count > 1:
+                middlegame -= sign * DOUBLED_PENALTY[0] * (count - 1)
+                endgame -= sign * DOUBLED_PENALTY[1] * (count - 1)
+    return middlegame, endgame
+
+class PawnHashTable:
+    def __init__(self, size=PAWN_TABLE_SIZE):
+        self.mask = size - 1
+        # (pawnKey, middlegame, endgame) per slot - one tuple so a reader on another thread never sees half an entry
+        self.entries = [None] * size
+        self.probes = 0
+        self.hits = 0
+
+    def Probe(self, position): # (middlegame, endgame), worked out and stored on a miss
+        self.probes += 1
+        key = position.pawnKey
+        slot = key & self.mask
+        entry = self.entries[slot]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1], entry[2]
+        middlegame, endgame = EvaluatePawns(position)
+        self.entries[slot] = (key, middlegame, endgame)
+        return middlegame, endgame
+
+    def HitRate(self):
+        return self.hits / self.probes if self.probes else 0
@@ -0,0 +1,98 @@
+# perft - counts the leaf nodes of the legal move tree to a fixed depth, used to check the
+# move generator against known counts and to time it
+#   python -m chesscore.perft                       run the bundled positions
+#   python -m chesscore.perft 4 "<fen>" --divide    count one position, per root move
+import argparse
+import time
+from chesscore.bitboard import Position, START_FEN, MoveToUci
+from chesscore.movegen import LegalMoves
+
+# known counts (depth: nodes) from the chessprogramming wiki and Martin Sedlak's perft suite
+PERFT_POSITIONS = [
+    ("start position", START_FEN, {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("position 3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("position 4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    ("illegal en passant 1", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", {6: 1134888}),
+    ("illegal en passant 2", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1", {6: 1015133}),
+    ("en passant capture checks", "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1", {6: 1440467}),
+    ("short castling gives check", "5k2/8/8/8/8/8/8/4K2R w K - 0 1", {6: 661072}),
+    ("long castling gives check", "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1", {6: 803711}),
+    ("castle rights", "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1", {4: 1274206}),
+    ("castling prevented", "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1", {4: 1720476}),
+    ("promote out of check", "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1", {6: 3821001}),
+    ("discovered check", "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1", {5: 1004658}),
+    ("promote to give check", "4k3/1P6/8/8/8/8/K7/8 w - - 0 1", {6: 217342}),
+    ("underpromote to check", "8/P1k5/K7/8/8/8/8/8 w - - 0 1", {6: 92683}),
+    ("self stalemate", "K1k5/8/P7/8/8/8/8/8 w - - 0 1", {6: 2217}),
+    ("stalemate and checkmate", "8/k1P5/8/1K6/8/8/8/8 w - - 0 1", {7: 567584}),
+    ("double check", "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1", {4: 23527}),
+]
+
+def Perft(position, depth):
+    moves = LegalMoves(position)
+    if depth == 1: # bulk count - the legal move list is the leaf count
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        position.MakeMove(move)
+        nodes += Perft(position, depth - 1)
+        position.UnmakeMove()
+    return nodes
+
+def Divide(position, depth): # leaf count under each root move
+    counts = {}
+    for move in LegalMoves(position):
+        position.MakeMove(move)
+        counts[MoveToUci(move)] = Perft(position, depth - 1) if depth > 1 else 1
+        position.UnmakeMove()
+    return counts
+
+def TimedPerft(position, depth):
+    startTime = time.perf_counter()
+    nodes = Perft(position, depth) if depth > 0 else 1
+    elapsed = time.perf_counter() - startTime
+    return nodes, elapsed
+
+def RunSuite(maxDepth):
+    failures = 0
+    totalNodes = totalTime = 0
+    for name, fen, counts in PERFT_POSITIONS:
+        for depth, expected in sorted(counts.items()):
+            if depth > maxDepth:
+                continue
+            nodes, elapsed = TimedPerft(Position.FromFen(fen), depth)
+            totalNodes += nodes
+            totalTime += elapsed
+            result = "ok" if nodes == expected else f"FAIL (expected {expected})"
+            failures += nodes != expected
+            print(f"{name:<28} depth {depth}  {nodes:>9} nodes  {elapsed:7.2f}s  {nodes / max(elapsed, 1e-9):>9.0f} nps  {result}")
+    print(f"total {totalNodes} nodes in {totalTime:.2f}s ({totalNodes / max(totalTime, 1e-9):.0f} nps), {failures} failed")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="count legal move tree leaf nodes")
+    parser.add_argument("depth", type=int, nargs="?", default=4, help="search depth (bundled suite: maximum depth)")
+    parser.add_argument("fen", nargs="?", help="position to count, runs the bundled suite if left out")
+    parser.add_argument("--divide", action="store_true", help="print the count under each root move")
+    arguments = parser.parse_args()
+
+    if arguments.fen is None:
+        raise SystemExit(1 if RunSuite(arguments.depth) else 0)
+
+    position = Position.FromFen(arguments.fen)
+    if arguments.divide:
+        startTime = time.perf_counter()
+        counts = Divide(position, arguments.depth)
+        elapsed = time.perf_counter() - startTime
+        for move, nodes in counts.items():
+            print(f"{move}: {nodes}")
+        nodes = sum(counts.values())
+        print(f"\nmoves {len(counts)}")
+    else:
+        nodes, elapsed = TimedPerft(position, arguments.depth)
+    print(f"nodes {nodes}  time {elapsed:.2f}s  nps {nodes / max(elapsed, 1e-9):.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+# players - humans are driven by the GUI, the AI searches with negamax principal variation search
+from chesscore.transposition import TranspositionTable, EXACT, LOWER, UPPER
+from chesscore.timemanager import TimeManager
+
+NULL_WINDOW = 0.001 # width of the scout window in pawns - only has to tell "better than alpha" from "not"
+DELTA_MARGIN = 2 # pawns - a capture that can't lift the score this close to alpha isn't searched in quiescence
+
+# checkmate is MATE_SCORE less the plies from the root to the mate, so a quicker mate always scores higher
+MATE_SCORE = 10000
+
+MAX_DEPTH = 64 # iterative deepening goes until the time manager says stop, or this deep
+TIME_CHECK_NODES = 256 # nodes between looks at the clock (must be a power of two)
+ROOT_SPLIT_MIN_DEPTH = 3 # shallower than this the root isn't worth sending to other processes
+
+# move ordering - the stages are in PickMoves, quiet moves within a stage go by history score
+MAX_PLY = 128
+MATE_BOUND = MATE_SCORE - 2 * MAX_PLY # scores past this are mates, with room for the deepest one quiescence can find
+# history scores are halved when one gets this big - old cutoffs fade so the quiet move order keeps up with
+# the game, and the scores (which carry over between searches) can't grow without limit
+HISTORY_LIMIT = 400000
+
+# selectivity
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2 # R - the null move is searched this much shallower (plus one more at depth 7+)
+LMR_MIN_DEPTH = 3
+LMR_FULL_DEPTH_MOVES = 3 # the first few moves are always searched to full depth
+
+# aspiration windows - later iterations search a window around the last score, widened when it falls outside
+ASPIRATION_MIN_DEPTH = 3
+ASPIRATION_WINDOW = 0.25 # pawns either side to start with
+ASPIRATION_MAX_WINDOW = 4 # past this a failed side just opens up completely
+
+# the table stores mate scores as distance from the position itself, not from the root, so an entry stays
+# right when the same position is reached at a different ply
+def ScoreToTable(score, ply):
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+def ScoreFromTable(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+class SearchStopped(Exception): # raised inside the search once a stop has been requested
+    pass
+
+class Player:
+    def __init__(self, colour):
+        self.colour = colour
+
+class Human(Player):
+    def __init__(self, colour):
+        super().__init__(colour)
+    # human input handled by game loop
+
+class AI(Player):
+    def __init__(self, colour):
+        super().__init__(colour)
+        self.maxDepth = MAX_DEPTH
+        self.timeManager = TimeManager() # no limit until ChooseMove is given one
+        self.transpositionTable = TranspositionTable() # fixed size, so it doesn't grow from game to game
+        self.nodes = 0
+        self.stopRequested = False
+        self.killers = [[None, None] for ply in range(MAX_PLY)] # quiet moves that caused a cutoff at each ply
+        self.historyScores = {"w": [0] * 4096, "b": [0] * 4096} # indexed by fromSquare * 64 + toSquare
+        self.counterMoves = [None] * 4096 # quiet reply that refuted the previous move, indexed the same way
+        # switches so the effect of each can be measured
+        self.useNullMove = True
+        self.useLateMoveReductions = True
+        self.rootSplitter = None # smp.RootSplitter to spread the root moves over a process pool
+
+    def Stop(self): # safe to call from another thread, the search notices at its next node
+        self.stopRequested = True # left set until whoever starts the next search clears it
+
+    # timeManager (see timemanager.py) sets the budget, None for no limit
+    # onIteration(depth, evaluation, nodes, seconds, principalVariation) is called after each completed depth
+    # startDepth lets Lazy SMP helpers (smp.py) start out of step with the main search
+    def ChooseMove(self, board, engine, timeManager=None, maxDepth=None, onIteration=None, startDepth=1):
+        self.timeManager = timeManager if timeManager is not None else TimeManager()
+        self.timeManager.Start()
+        board = board.CopyPosition() # search makes/unmakes moves on its own board, not the caller's
+        maxDepth = self.maxDepth if maxDepth is None else maxDepth
+        self.nodes = 0
+        self.transpositionTable.NewSearch()
+        self.killers = [[None, None] for ply in range(MAX_PLY)] # killers are position specific, history carries over
+        self.AgeHistory()
+
+        bestMove = None # carried into the next iteration and searched first
+        evaluation = None
+        depth = startDepth
+        while depth <= maxDepth:
+            try:
+                currentBest, evaluation = self.AspirationSearch(board, engine, depth, bestMove, evaluation)
+            except SearchStopped: # unfinished depth - keep the last completed one
+                break
+            if currentBest is None:
+                break
+            bestMoveChanged = currentBest != bestMove
+            bestMove = currentBest
+            if onIteration is not None:
+                principalVariation = self.GetPrincipalVariation(board, engine, bestMove, depth)
+                onIteration(depth, evaluation, self.nodes, self.timeManager.Elapsed(), principalVariation)
+            if self.timeManager.ShouldStop(bestMoveChanged):
+                break
+            depth += 1
+        return bestMove
+
+    # stop flag from another thread, or out of time - polled every TIME_CHECK_NODES nodes
+    def CheckStop(self):
+        if self.stopRequested or (self.nodes & (TIME_CHECK_NODES - 1) == 0 and self.timeManager.HardExpired()):
+            raise SearchStopped
+
+    # best move, then the stored best reply in each following position
+    def GetPrincipalVariation(self, board, engine, firstMove, depth):
+        principalVariation = [firstMove]
+        board.MakeMove(firstMove)
+        while len(principalVariation) < depth:
+            entry = self.transpositionTable.Probe(engine.HashBoard(board))
+            if entry is None or entry[3] is None or entry[3] not in engine.GetLegalMoves(board.turn, board):
+                break
+            principalVariation.append(entry[3])
+            board.MakeMove(entry[3])
+        for move in principalVariation:
+            board.UnmakeMove()
+        return principalVariation
+
+    # generates all legal moves in the form: (fromSquare, toSquare, promotion)
+    def GetAllLegalMoves(self, board, engine, colour):
+        return engine.GetLegalMoves(colour, board)
+
+    # staged move picker - most nodes cut off after the first move or two, so moves are handed out in stages
+    # and each stage is only worked out once the search asks for it:
+    # hash move (checked on its own, nothing generated yet), winning captures (only captures and promotions
+    # generated), killers and counter move (each checked on its own), quiet moves by history (only now
+    # generated), then captures that look like they lose material
+    def PickMoves(self, board, engine, hashMove=None, ply=0):
+        if hashMove is not None and engine.IsLegalMove(hashMove, board):
+            yield hashMove
+
+        captures = [(self.MvvLvaScore(move, board, engine), move)
+                    for move in engine.GetTacticalMoves(board.turn, board) if move != hashMove]
+
+        losingCaptures = []
+        while captures: # selection by partial max - no point sorting captures that are never reached
+            bestIndex = 0
+            for index in range(1, len(captures)):
+                if captures[index][0] > captures[bestIndex][0]:
+                    bestIndex = index
+            captures[bestIndex], captures[-1] = captures[-1], captures[bestIndex]
+            move = captures.pop()[1]
+            if self.IsLosingCapture(move, board, engine):
+                losingCaptures.append(move)
+            else:
+                yield move
+
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        previousMove = self.PreviousMoveIndex(board)
+        counterMove = self.counterMoves[previousMove] if previousMove is not None else None
+        picked = [hashMove]
+        for move in (killers[0], killers[1], counterMove):
+            # killers come from other positions at this ply, so they may not be legal (or quiet) here
+            if (move is not None and move not in picked and engine.IsLegalMove(move, board)
+                    and not self.IsTactical(move, board)):
+                picked.append(move)
+                yield move
+
+        quiets = [move for move in engine.GetQuietMoves(board.turn, board) if move not in picked]
+        history = self.historyScores[board.turn]
+        quiets.sort(key=lambda move: history[move[0] * 64 + move[1]], reverse=True)
+        yield from quiets
+        yield from losingCaptures
+
+    def HasPieces(self, board, colour): # anything besides pawns and the king
+        bitboards = board.bitboards[colour]
+        return bool(bitboards["n"] | bitboards["b"] | bitboards["r"] | bitboards["q"])
+
+    # cheap stand-in for a static exchange evaluation - a bigger piece taking a smaller one that is defended
+    def IsLosingCapture(self, move, board, engine):
+        attackerValue = engine.pieceValues[board.squares[move[0]][1]]
+        if self.CaptureGain(move, board, engine) >= attackerValue:
+            return False
+        enemyColour = "b" if board.turn == "w" else "w"
+        return engine.IsSquareAttacked(move[1], enemyColour, board)
+
+    def PreviousMoveIndex(self, board): # None at the root or after a null move
+        if not board.history or board.history[-1][0] is None:
+            return None
+        fromSquare, toSquare, _ = board.history[-1][0]
+        return fromSquare * 64 + toSquare
+
+    # a quiet move caused a beta cutoff - remember it as a killer, counter move and in the history table
+    def UpdateQuietHeuristics(self, move, board, depth, ply):
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        previousMove = self.PreviousMoveIndex(board)
+        if previousMove is not None:
+            self.counterMoves[previousMove] = move
+        history = self.historyScores[board.turn]
+        index = move[0] * 64 + move[1]
+        history[index] += depth * depth # deep cutoffs say more than shallow ones
+        if history[index] > HISTORY_LIMIT:
+            self.AgeHistory()
+
+    def AgeHistory(self):
+        for colour, history in self.historyScores.items():
+            self.historyScores[colour] = [score // 2 for score in history]
+
+    # negamax - scores are from the side to move's point of view, so each ply just flips the sign
+    # principal variation search - the first (expected best) move gets the full window, the rest a null window
+    # that only proves they are no better, with a full re-search if one turns out to be
+    def Minimax(self, board, engine, depth, alpha, beta, ply=1):
+        if depth == 0: # horizon - carry on with captures only so the leaf isn't mid-exchange
+            return self.Quiescence(board, engine, alpha, beta, ply)
+        self.nodes += 1
+        self.CheckStop()
+
+        boardKey = engine.HashBoard(board)
+        hashMove = None
+        entry = self.transpositionTable.Probe(boardKey)
+        if entry is not None:
+            storedDepth, storedEvaluation, bound, hashMove = entry
+            storedEvaluation = ScoreFromTable(storedEvaluation, ply)
+            if storedDepth >= depth and (bound == EXACT or (bound == LOWER and storedEvaluation >= beta)
+                                         or (bound == UPPER and storedEvaluation <= alpha)):
+                return storedEvaluation
+
+        inCheck = engine.IsCheck(board.turn, board)
+
+        # null move pruning - if passing still leaves us above beta, a real move would too, so don't bother
+        # not in check (passing would be illegal), not twice in a row, and not with only pawns left
+        # since those endings are where zugzwang (every move making things worse) really happens
+        if (self.useNullMove and not inCheck and depth >= NULL_MOVE_MIN_DEPTH and beta < MATE_BOUND
+                and board.history and board.history[-1][0] is not None and self.HasPieces(board, board.turn)):
+            reduction = NULL_MOVE_REDUCTION + (1 if depth > 6 else 0)
+            board.MakeNullMove()
+            evaluation = -self.Minimax(board, engine, max(depth - 1 - reduction, 0), -beta, -beta + NULL_WINDOW, ply + 1)
+            board.UnmakeNullMove()
+            if evaluation >= beta:
+                return beta # not the null move score itself, which could be an unproven mate
+
+        originalAlpha = alpha
+        bestEval = -float("inf")
+        bestMove = None
+        movesSearched = 0
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        for move in self.PickMoves(board, engine, hashMove, ply):
+            isQuiet = not self.IsTactical(move, board)
+            board.MakeMove(move)
+            movesSearched += 1
+            if movesSearched == 1:
+                evaluation = -self.Minimax(board, engine, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                # late move reductions - with good ordering, late quiet moves are rarely best, so search them
+                # shallower first and only give them the full depth if they beat alpha anyway
+                reduction = 0
+                if (self.useLateMoveReductions and isQuiet and depth >= LMR_MIN_DEPTH and movesSearched > LMR_FULL_DEPTH_MOVES
+                        and not inCheck and move not in killers and not engine.IsCheck(board.turn, board)):
+                    reduction = 2 if depth >= 6 and movesSearched > 2 * LMR_FULL_DEPTH_MOVES else 1
+                evaluation = -self.Minimax(board, engine, depth - 1 - reduction, -alpha - NULL_WINDOW, -alpha, ply + 1)
+                if reduction and evaluation > alpha: # reduced search failed high - check it at full depth
+                    evaluation = -self.Minimax(board, engine, depth - 1, -alpha - NULL_WINDOW, -alpha, ply + 1)
+                if alpha < evaluation < beta:
+                    evaluation = -self.Minimax(board, engine, depth - 1, -beta, -alpha, ply + 1)
+            board.UnmakeMove()
+            if evaluation > bestEval or bestMove is None:
+                bestEval = evaluation
+                bestMove = move
+            alpha = max(alpha, evaluation)
+            if alpha >= beta:
+                if isQuiet:
+                    self.UpdateQuietHeuristics(move, board, depth, ply)
+                break
+
+        if movesSearched == 0: # no legal moves - checkmate or stalemate
+            return -(MATE_SCORE - ply) if inCheck else 0
+
+        # only a score strictly inside the window is exact - a cutoff only proves a bound
+        if bestEval <= originalAlpha:
+            bound = UPPER
+        elif bestEval >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.transpositionTable.Store(boardKey, depth, ScoreToTable(bestEval, ply), bound, bestMove)
+        return bestEval
+
+    # quiescence search - only captures and promotions, until the position is quiet
+    # the side to move can "stand pat" on the static evaluation since it doesn't have to capture,
+    # except in check where every evasion has to be looked at
+    def Quiescence(self, board, engine, alpha, beta, ply):
+        self.nodes += 1
+        self.CheckStop()
+
+        sign = 1 if board.turn == "w" else -1
+        if engine.IsCheck(board.turn, board):
+            moves = self.GetAllLegalMoves(board, engine, board.turn)
+            if not moves:
+                return -(MATE_SCORE - ply) # checkmated
+            bestEval = -float("inf")
+            standPat = None
+        else:
+            standPat = sign * engine.Evaluate(board)
+            if standPat >= beta:
+                return standPat
+            alpha = max(alpha, standPat)
+            bestEval = standPat
+            moves = engine.GetTacticalMoves(board.turn, board)
+
+        scoredMoves = []
+        for move in moves:
+            gain = self.CaptureGain(move, board, engine)
+            # delta pruning - even winning this piece for nothing wouldn't get back to alpha
+            if standPat is not None and standPat + gain + DELTA_MARGIN < alpha:
+                continue
+            scoredMoves.append((self.MvvLvaScore(move, board, engine), move))
+        scoredMoves.sort(key=lambda scoredMove: scoredMove[0], reverse=True)
+
+        for _, move in scoredMoves:
+            board.MakeMove(move)
+            evaluation = -self.Quiescence(board, engine, -beta, -alpha, ply + 1)
+            board.UnmakeMove()
+            if evaluation > bestEval:
+                bestEval = evaluation
+            alpha = max(alpha, evaluation)
+            if alpha >= beta:
+                break
+        return bestEval
+
+    def IsTactical(self, move, board): # captures (including en passant) and promotions
+        fromSquare, toSquare, promotion = move
+        return (promotion is not None or board.squares[toSquare] is not None
+                or (toSquare == board.enPassantSquare and board.squares[fromSquare][1] == "p"))
+
+    def CaptureGain(self, move, board, engine): # material the move wins straight away
+        fromSquare, toSquare, promotion = move
+        captured = board.squares[toSquare]
+        gain = engine.pieceValues[captured[1]] if captured is not None else 0
+        if captured is None and toSquare == board.enPassantSquare and board.squares[fromSquare][1] == "p":
+            gain = engine.pieceValues["p"]
+        if promotion is not None:
+            gain += engine.pieceValues[promotion] - engine.pieceValues["p"]
+        return gain
+
+    # most valuable victim, least valuable attacker - big captures first, and with the cheapest piece
+    def MvvLvaScore(self, move, board, engine):
+        return 10 * self.CaptureGain(move, board, engine) - engine.pieceValues[board.squares[move[0]][1]]
+
+    # search the root in a narrow window around the previous iteration's score (white's point of view, like
+    # the result) - if the score lands outside it, widen that side and search again
+    def AspirationSearch(self, board, engine, depth, previousBest, previousEvaluation):
+        if depth < ASPIRATION_MIN_DEPTH or previousEvaluation is None or abs(previousEvaluation) >= MATE_BOUND:
+            return self.GetBestMove(board, engine, depth, previousBest)
+
+        sign = 1 if board.turn == "w" else -1
+        score = sign * previousEvaluation
+        lowerWindow = upperWindow = ASPIRATION_WINDOW
+        while True:
+            alpha = score - lowerWindow if lowerWindow <= ASPIRATION_MAX_WINDOW else -float("inf")
+            beta = score + upperWindow if upperWindow <= ASPIRATION_MAX_WINDOW else float("inf")
+            bestMove, evaluation = self.GetBestMove(board, engine, depth, previousBest, alpha, beta)
+            # (a side that is already fully open can't fail, e.g. a mate score against an infinite bound)
+            if sign * evaluation <= alpha and alpha > -float("inf"): # failed low - every move is worse than we hoped
+                lowerWindow *= 2
+            elif sign * evaluation >= beta and beta < float("inf"): # failed high - this move is better, search again to find by how much
+                upperWindow *= 2
+                previousBest = bestMove
+            else:
+                return bestMove, evaluation
+
+    # root of the search - returns the best move and its evaluation from white's point of view
+    def GetBestMove(self, board, engine, depth, previousBest=None, alpha=-float("inf"), beta=float("inf")):
+        sign = 1 if board.turn == "w" else -1
+        if self.rootSplitter is not None and depth >= ROOT_SPLIT_MIN_DEPTH:
+            bestMove, bestEval = self.rootSplitter.SearchRoot(self, board, engine, depth, previousBest, alpha, beta)
+        else:
+            bestMove, bestEval = self.SearchRootMoves(board, engine, depth, self.PickMoves(board, engine, previousBest), alpha, beta)
+        if bestMove is None: # no legal moves
+            return None, -sign * MATE_SCORE if engine.IsCheck(board.turn, board) else 0
+
+        if bestEval <= alpha:
+            bound = UPPER
+        elif bestEval >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.transpositionTable.Store(engine.HashBoard(board), depth, bestEval, bound, bestMove)
+        return bestMove, sign * bestEval
+
+    # principal variation search over some of the root moves - (best move, its score for the side to move)
+    def SearchRootMoves(self, board, engine, depth, moves, alpha, beta):
+        bestEval = -float("inf")
+        bestMove = None
+        for move in moves:
+            board.MakeMove(move)
+            if bestMove is None:
+                evaluation = -self.Minimax(board, engine, depth - 1, -beta, -alpha)
+            else:
+                evaluation = -self.Minimax(board, engine, depth - 1, -alpha - NULL_WINDOW, -alpha)
+                if alpha < evaluation < beta:
+                    evaluation = -self.Minimax(board, engine, depth - 1, -beta, -alpha)
+            board.UnmakeMove()
+            if evaluation > bestEval or bestMove is None:
+                bestEval = evaluation
+                bestMove = move
+            alpha = max(alpha, evaluation)
+            if alpha >= beta:
+                break
+        return bestMove, bestEval
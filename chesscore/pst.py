@@ -0,0 +1,108 @@
+# material and piece-square tables - what each piece is worth on each square, separately for the middlegame
+# and the endgame. Position adds/subtracts these as pieces come and go (like the Zobrist key) so the
+# evaluation never has to look at the whole board, it just blends the two totals by the game phase
+# tables are in centipawns from white's point of view, laid out as you see the board - 8th rank first
+
+MIDDLEGAME_PIECE_VALUES = {"p": 100, "n": 320, "b": 330, "r": 500, "q": 900, "k": 0} # both sides always have a king
+ENDGAME_PIECE_VALUES = {"p": 120, "n": 300, "b": 330, "r": 520, "q": 920, "k": 0}
+
+# game phase - the starting pieces add up to MAX_PHASE, bare kings and pawns are 0 (pure endgame)
+PHASE_WEIGHTS = {"p": 0, "n": 1, "b": 1, "r": 2, "q": 4, "k": 0}
+MAX_PHASE = 24
+
+PAWN_MIDDLEGAME = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0)
+
+PAWN_ENDGAME = ( # passed pawns are scored separately, this is just the push towards promotion
+      0,   0,   0,   0,   0,   0,   0,   0,
+     80,  80,  80,  80,  80,  80,  80,  80,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     15,  15,  15,  15,  15,  15,  15,  15,
+      5,   5,   5,   5,   5,   5,   5,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0)
+
+KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50)
+
+BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20)
+
+ROOK = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0)
+
+QUEEN = (
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20)
+
+KING_MIDDLEGAME = ( # tucked away behind its pawns
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20)
+
+KING_ENDGAME = ( # out in the middle where it can do something
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50)
+
+MIDDLEGAME_TABLES = {"p": PAWN_MIDDLEGAME, "n": KNIGHT, "b": BISHOP, "r": ROOK, "q": QUEEN, "k": KING_MIDDLEGAME}
+ENDGAME_TABLES = {"p": PAWN_ENDGAME, "n": KNIGHT, "b": BISHOP, "r": ROOK, "q": QUEEN, "k": KING_ENDGAME}
+
+# tables above flipped into square order (a1 = 0) with the material added, negative for black, so a piece
+# arriving or leaving is a single add/subtract (kept in whole centipawns so the totals never drift)
+def BuildScores(tables, pieceValues):
+    scores = {}
+    for pieceType, table in tables.items():
+        # square ^ 56 flips the rank - white's a1 is the bottom left of the table, black's a1 is its top left
+        scores["w" + pieceType] = [pieceValues[pieceType] + table[square ^ 56] for square in range(64)]
+        scores["b" + pieceType] = [-(pieceValues[pieceType] + table[square]) for square in range(64)]
+    return scores
+
+MIDDLEGAME_SCORES = BuildScores(MIDDLEGAME_TABLES, MIDDLEGAME_PIECE_VALUES)
+ENDGAME_SCORES = BuildScores(ENDGAME_TABLES, ENDGAME_PIECE_VALUES)
+PHASES = {colour + pieceType: weight for pieceType, weight in PHASE_WEIGHTS.items() for colour in ("w", "b")}
@@ -0,0 +1,227 @@
+# parallel search for multi-core machines, since threads can't get past the GIL
+#
+# Lazy SMP - helper processes search the same root as the main search, sharing its transposition table through shared
+# memory, so each one mostly finds the others' work already in the table and races ahead into different lines
+# odd helpers start a depth ahead so they aren't all searching the same depth at the same time
+# the result is the deepest completed iteration from any process
+#
+# root splitting - simpler: the first root move is searched as normal to get a score to beat, then the rest are
+# dealt out to a process pool as FEN + move list. alpha lives in a shared value so every worker searches
+# against the best score found anywhere so far
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from chesscore.bitboard import Position
+from chesscore.engine import Engine
+from chesscore.players import AI, SearchStopped, NULL_WINDOW, TIME_CHECK_NODES, MAX_PLY
+from chesscore.transposition import TranspositionTable, DEFAULT_SIZE_MB
+
+POLL_SECONDS = 0.05 # how often the main process checks for a stop while it waits on the pool
+
+def HelperSearch(index, fen, tableName, bucketCount, age, maxDepth, useNullMove, useLateMoveReductions, stopEvent, results):
+    position = Position.FromFen(fen)
+    engine = Engine(position)
+    ai = AI(position.turn)
+    ai.useNullMove = useNullMove # same switches as the main search
+    ai.useLateMoveReductions = useLateMoveReductions
+    ai.transpositionTable = TranspositionTable.Attach(tableName, bucketCount, age)
+    # stopEvent comes from the main process, turn it into the AI's own stop flag
+    threading.Thread(target=lambda: (stopEvent.wait(), ai.Stop()), daemon=True).start()
+
+    def Report(depth, evaluation, nodes, seconds, principalVariation):
+        results.put(("iteration", index, depth, evaluation, nodes, principalVariation[0]))
+
+    if not stopEvent.is_set():
+        ai.ChooseMove(position, engine, None, maxDepth, Report, startDepth=1 + index % 2)
+    ai.transpositionTable.Close()
+    results.put(("done", index))
+
+# same arguments and result as AI.ChooseMove, with processes - 1 helpers alongside the normal search
+def LazySmpSearch(ai, board, engine, processes, timeManager=None, maxDepth=None, onIteration=None):
+    table = ai.transpositionTable
+    table.Share() # no-op after the first search, so the table carries over between moves like it normally does
+    maxDepth = ai.maxDepth if maxDepth is None else maxDepth
+    stopEvent = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    helpers = [multiprocessing.Process(target=HelperSearch, daemon=True,
+                                       args=(index, board.ToFen(), table.sharedMemory.name, table.bucketCount,
+                                             table.age, maxDepth, ai.useNullMove, ai.useLateMoveReductions,
+                                             stopEvent, results))
+               for index in range(1, processes)]
+    for helper in helpers:
+        helper.start()
+
+    completed = {} # process index: (depth, evaluation, move) of its deepest finished iteration
+    helperNodes = {}
+    finished = set()
+
+    def Collect(message):
+        if message[0] == "done":
+            finished.add(message[1])
+        else:
+            _, index, depth, evaluation, nodes, move = message
+            completed[index] = (depth, evaluation, move)
+            helperNodes[index] = nodes
+
+    def Record(depth, evaluation, nodes, seconds, principalVariation): # main search finished a depth
+        completed[0] = (depth, evaluation, principalVariation[0])
+        while True:
+            try:
+                Collect(results.get_nowait())
+            except queue.Empty:
+                break
+        if onIteration is not None:
+            onIteration(depth, evaluation, nodes + sum(helperNodes.values()), seconds, principalVariation)
+
+    try:
+        ai.ChooseMove(board, engine, timeManager, maxDepth, Record)
+    finally:
+        stopEvent.set()
+        while len(finished) < len(helpers): # drain before joining, a process can't exit with its queue full
+            try:
+                Collect(results.get(timeout=1))
+            except queue.Empty:
+                if not any(helper.is_alive() for helper in helpers):
+                    break
+        for helper in helpers:
+            helper.join()
+
+    if not completed:
+        return None
+    # deepest wins, the main search breaking ties since its own pv and score were what got reported
+    bestIndex = max(completed, key=lambda index: (completed[index][0], index == 0))
+    return completed[bestIndex][2]
+
+class RootSplitter:
+    # the workers' search switches are fixed when the pool starts, so a change to them needs a new RootSplitter
+    def __init__(self, processes, tableSizeMb=DEFAULT_SIZE_MB, useNullMove=True, useLateMoveReductions=True):
+        self.processes = processes
+        self.useNullMove = useNullMove
+        self.useLateMoveReductions = useLateMoveReductions
+        self.sharedAlpha = multiprocessing.Value("d", -float("inf"))
+        self.stopFlag = multiprocessing.Value("b", 0, lock=False)
+        # each worker has its own table - this size, rebuilt/emptied whenever the generation goes up
+        self.tableSizeMb = multiprocessing.Value("d", tableSizeMb, lock=False)
+        self.tableGeneration = multiprocessing.Value("i", 0, lock=False)
+        self.pool = ProcessPoolExecutor(processes, initializer=InitRootWorker,
+                                        initargs=(self.sharedAlpha, self.stopFlag, self.tableSizeMb, self.tableGeneration,
+                                                  useNullMove, useLateMoveReductions))
+
+    def Shutdown(self):
+        self.stopFlag.value = 1
+        self.pool.shutdown(cancel_futures=True)
+
+    # the workers pick these up at the start of their next task (never mid search - callers stop first)
+    def ClearTables(self):
+        self.tableGeneration.value += 1
+
+    def ResizeTables(self, sizeMb):
+        self.tableSizeMb.value = sizeMb
+        self.tableGeneration.value += 1
+
+    # same result as AI.SearchRootMoves over every root move
+    def SearchRoot(self, ai, board, engine, depth, previousBest, alpha, beta):
+        moves = list(ai.PickMoves(board, engine, previousBest))
+        bestMove, bestEval = ai.SearchRootMoves(board, engine, depth, moves[:1], alpha, beta)
+        alpha = max(alpha, bestEval)
+        if bestMove is None or alpha >= beta or len(moves) == 1:
+            return bestMove, bestEval
+
+        self.sharedAlpha.value = alpha
+        self.stopFlag.value = 0
+        fen = board.ToFen()
+        # dealt out in turn rather than in blocks so every worker gets some of the likely good moves
+        # the table age tells the workers when a new search (and so maybe a new position) has started
+        age = ai.transpositionTable.age
+        futures = [self.pool.submit(SearchRootMoves, fen, moves[1 + index::self.processes], depth, beta, age)
+                   for index in range(min(self.processes, len(moves) - 1))]
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=POLL_SECONDS)
+            if pending and (ai.stopRequested or ai.timeManager.HardExpired()):
+                self.stopFlag.value = 1
+                wait(pending)
+                raise SearchStopped
+
+        for future in futures:
+            scores, nodes = future.result()
+            ai.nodes += nodes
+            if scores is None: # the worker was stopped part way through
+                raise SearchStopped
+            for move, evaluation in scores:
+                if evaluation > bestEval:
+                    bestEval = evaluation
+                    bestMove = move
+        return bestMove, bestEval
+
+# pool worker state, set up once per process by InitRootWorker
+rootWorker = {}
+
+class RootWorkerAI(AI): # stops on the splitter's shared flag rather than a flag set from the same process
+    def __init__(self, colour):
+        super().__init__(colour)
+        self.searchAge = None # age of the main search this worker last helped with
+
+    def CheckStop(self):
+        if self.nodes & (TIME_CHECK_NODES - 1) == 0 and rootWorker["stopFlag"].value:
+            raise SearchStopped
+
+    def NewSearch(self, age): # what ChooseMove does at the start of a search, for a worker that never calls it
+        if age == self.searchAge:
+            return
+        self.searchAge = age
+        self.transpositionTable.NewSearch()
+        self.killers = [[None, None] for ply in range(MAX_PLY)]
+        self.AgeHistory()
+
+def InitRootWorker(sharedAlpha, stopFlag, tableSizeMb, tableGeneration, useNullMove, useLateMoveReductions):
+    rootWorker["sharedAlpha"] = sharedAlpha
+    rootWorker["stopFlag"] = stopFlag
+    rootWorker["tableSizeMb"] = tableSizeMb
+    rootWorker["tableGeneration"] = tableGeneration
+    rootWorker["generation"] = tableGeneration.value
+    ai = RootWorkerAI("w") # kept between calls so its table and history build up
+    ai.transpositionTable = TranspositionTable(tableSizeMb.value)
+    ai.useNullMove = useNullMove
+    ai.useLateMoveReductions = useLateMoveReductions
+    rootWorker["ai"] = ai
+
+def UpdateRootWorkerTable(): # ucinewgame or a new Hash size since the last task
+    generation = rootWorker["tableGeneration"].value
+    if generation == rootWorker["generation"]:
+        return
+    rootWorker["generation"] = generation
+    table = rootWorker["ai"].transpositionTable
+    sizeMb = rootWorker["tableSizeMb"].value
+    if sizeMb != table.sizeMb:
+        table.Resize(sizeMb)
+    else:
+        table.Clear()
+
+def SearchRootMoves(fen, moves, depth, beta, age): # runs in a pool process - ([(move, score)] or None if stopped, nodes)
+    position = Position.FromFen(fen)
+    engine = Engine(position)
+    ai = rootWorker["ai"]
+    UpdateRootWorkerTable()
+    ai.NewSearch(age)
+    sharedAlpha = rootWorker["sharedAlpha"]
+    ai.nodes = 0
+    scores = []
+    try:
+        for move in moves:
+            alpha = sharedAlpha.value # whatever the best score is by now, from any process
+            position.MakeMove(move)
+            evaluation = -ai.Minimax(position, engine, depth - 1, -alpha - NULL_WINDOW, -alpha)
+            if alpha < evaluation < beta:
+                evaluation = -ai.Minimax(position, engine, depth - 1, -beta, -alpha)
+            position.UnmakeMove()
+            scores.append((move, evaluation))
+            with sharedAlpha.get_lock():
+                if evaluation > sharedAlpha.value:
+                    sharedAlpha.value = evaluation
+            if evaluation >= beta:
+                break
+    except SearchStopped:
+        return None, ai.nodes
+    return scores, ai.nodes
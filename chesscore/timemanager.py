@@ -0,0 +1,43 @@
+# per move time budget for the AI, all times in seconds
+# the soft limit is when iterative deepening stops starting new depths, the hard limit is when a search in
+# progress gets aborted (Minimax polls it every few hundred nodes)
+import time
+
+MOVES_TO_GO = 30 # assumed moves left in the game when the clock doesn't say
+MOVE_OVERHEAD = 0.05 # kept back each move for the GUI/OS to actually play it
+HARD_LIMIT_FACTOR = 4 # how far past the soft limit an unfinished depth may run
+MAX_CLOCK_SHARE = 0.5 # never spend more than this much of the remaining clock on one move
+
+# soft limit scale by how many iterations in a row have picked the same best move
+STABILITY_FACTORS = (1.5, 1.0, 0.8, 0.6, 0.5)
+
+class TimeManager:
+    def __init__(self, remaining=None, increment=0, movesToGo=None, moveTime=None):
+        if moveTime is not None: # fixed time per move
+            self.softLimit = self.hardLimit = max(moveTime - MOVE_OVERHEAD, 0.01)
+        elif remaining is not None:
+            available = max(remaining - MOVE_OVERHEAD, 0.01)
+            budget = available / (movesToGo or MOVES_TO_GO) + 0.75 * increment
+            self.hardLimit = min(budget * HARD_LIMIT_FACTOR, available * MAX_CLOCK_SHARE)
+            self.softLimit = min(budget, self.hardLimit)
+        else: # no clock - search until stopped or the depth limit
+            self.softLimit = self.hardLimit = float("inf")
+        self.startTime = time.perf_counter()
+        self.stableIterations = 0
+
+    def Start(self):
+        self.startTime = time.perf_counter()
+        self.stableIterations = 0
+
+    def Elapsed(self):
+        return time.perf_counter() - self.startTime
+
+    def HardExpired(self):
+        return self.Elapsed() >= self.hardLimit
+
+    # called after each completed depth - the same best move again means less time is needed
+    def ShouldStop(self, bestMoveChanged):
+        self.stableIterations = 0 if bestMoveChanged else self.stableIterations + 1
+        factor = STABILITY_FACTORS[min(self.stableIterations, len(STABILITY_FACTORS) - 1)]
+        # the next depth takes several times longer than this one, so don't start it if it can't finish
+        return self.Elapsed() >= self.softLimit * factor
@@ -0,0 +1,144 @@
+# fixed size transposition table
+# each bucket (indexed by the low bits of the Zobrist key) has two slots - a depth-preferred slot that keeps the
+# deepest result from the current search, and an always-replace slot that takes whatever the first one turns away
+# entries are packed into two preallocated arrays rather than Python tuples, 16 bytes each:
+#   scores[slot] - the score as a double (keeps the float evaluation exactly)
+#   data[slot]   - everything else in one 64 bit word, laid out below
+# the same layout can live in shared memory instead (Share/Attach) so Lazy SMP processes share one table
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+DEFAULT_SIZE_MB = 16
+ENTRY_BYTES = 16 # 8 byte score + 8 byte data word
+
+# what the stored score means, since cutoffs only prove a bound
+EXACT = 0 # score was inside the window
+LOWER = 1 # failed high - the real score is at least this
+UPPER = 2 # failed low - the real score is at most this
+
+# data word: bits 0-14 move, 15-21 depth, 22-23 bound, 24-29 age, 30 used flag, 32-63 top half of the key
+# (the bottom half of the key is already implied by the bucket the entry is in)
+DEPTH_SHIFT, BOUND_SHIFT, AGE_SHIFT, KEY_SHIFT = 15, 22, 24, 32
+MOVE_MASK, DEPTH_MASK, BOUND_MASK, AGE_MASK = 0x7FFF, 0x7F, 0x3, 0x3F
+USED_FLAG = 1 << 30
+
+# moves pack as fromSquare | toSquare << 6 | promotion << 12, 0 meaning no move (from and to are never equal)
+PROMOTION_CODES = {None: 0, "q": 1, "r": 2, "b": 3, "n": 4}
+PROMOTION_TYPES = (None, "q", "r", "b", "n")
+
+def PackMove(move):
+    if move is None:
+        return 0
+    fromSquare, toSquare, promotion = move
+    return fromSquare | toSquare << 6 | PROMOTION_CODES[promotion] << 12
+
+def UnpackMove(packed):
+    if not packed:
+        return None
+    return (packed & 63, packed >> 6 & 63, PROMOTION_TYPES[packed >> 12])
+
+class TranspositionTable:
+    def __init__(self, sizeMb=DEFAULT_SIZE_MB):
+        self.sharedMemory = None
+        self.Resize(sizeMb)
+
+    def Resize(self, sizeMb):
+        self.Unshare()
+        buckets = max(1, int(sizeMb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        self.bucketCount = 1 << (buckets.bit_length() - 1) # round down to a power of two so the index is key & mask
+        self.mask = self.bucketCount - 1
+        self.sizeMb = sizeMb
+        self.Clear()
+
+    def Clear(self):
+        # slot 2 * bucket is depth-preferred, 2 * bucket + 1 always-replace
+        if self.sharedMemory is not None: # other processes have this buffer mapped, so zero it in place
+            self.scores[:] = array("d", [0.0]) * (2 * self.bucketCount)
+            self.data[:] = array("Q", [0]) * (2 * self.bucketCount)
+        else:
+            self.scores = array("d", [0.0]) * (2 * self.bucketCount)
+            self.data = array("Q", [0]) * (2 * self.bucketCount)
+        self.age = 0
+
+    # move the table (and what is in it) into shared memory that other processes can Attach to by name
+    def Share(self):
+        if self.sharedMemory is not None:
+            return
+        scores, data = self.scores, self.data
+        self.sharedMemory = SharedMemory(create=True, size=2 * self.bucketCount * ENTRY_BYTES)
+        self.MapSharedMemory()
+        self.scores[:] = scores
+        self.data[:] = data
+
+    def Unshare(self): # back to a private table (empty), freeing the shared memory
+        if self.sharedMemory is None:
+            return
+        self.Close()
+        self.sharedMemory.unlink()
+        self.sharedMemory = None
+
+    @classmethod
+    def Attach(cls, name, bucketCount, age): # a view of another process's shared table
+        table = cls.__new__(cls)
+        table.bucketCount = bucketCount
+        table.mask = bucketCount - 1
+        table.sizeMb = bucketCount * 2 * ENTRY_BYTES / (1024 * 1024)
+        table.sharedMemory = SharedMemory(name=name)
+        table.MapSharedMemory()
+        table.age = age
+        return table
+
+    def MapSharedMemory(self):
+        slots = 2 * self.bucketCount
+        self.scores = self.sharedMemory.buf[:8 * slots].cast("d")
+        self.data = self.sharedMemory.buf[8 * slots:16 * slots].cast("Q")
+
+    def Close(self): # let go of a shared table (the creator still has to Unshare to free it)
+        if self.sharedMemory is None:
+            return
+        self.scores.release()
+        self.data.release()
+        self.scores = self.data = None
+        self.sharedMemory.close()
+
+    def NewSearch(self): # entries from earlier searches become the first to be replaced
+        self.age = (self.age + 1) & AGE_MASK
+
+    def Probe(self, key): # (depth, score, bound, bestMove) or None
+        first = (key & self.mask) << 1
+        check = key >> KEY_SHIFT
+        data = self.data
+        for slot in (first, first + 1):
+            word = data[slot]
+            if word >> KEY_SHIFT == check and word & USED_FLAG:
+                score = self.scores[slot]
+                if data[slot] != word: # another process rewrote the slot while we read it
+                    return None
+                return (word >> DEPTH_SHIFT & DEPTH_MASK, score, word >> BOUND_SHIFT & BOUND_MASK,
+                        UnpackMove(word & MOVE_MASK))
+        return None
+
+    def Store(self, key, depth, score, bound, bestMove):
+        slot = (key & self.mask) << 1
+        check = key >> KEY_SHIFT
+        current = self.data[slot]
+        sameKey = current >> KEY_SHIFT == check and current & USED_FLAG
+        move = PackMove(bestMove)
+        if sameKey and not move:
+            move = current & MOVE_MASK # a leaf store shouldn't throw away a known best move
+        word = (check << KEY_SHIFT | USED_FLAG | self.age << AGE_SHIFT | bound << BOUND_SHIFT
+                | min(depth, DEPTH_MASK) << DEPTH_SHIFT | move)
+        replaceDepthPreferred = (not current & USED_FLAG or sameKey or (current >> AGE_SHIFT & AGE_MASK) != self.age
+                                 or depth >= (current >> DEPTH_SHIFT & DEPTH_MASK))
+        if not replaceDepthPreferred:
+            slot += 1 # always-replace slot
+        # the slot is marked empty while the score changes so a process reading it at the same time
+        # never pairs the new score with the old entry (Probe checks the word didn't change under it)
+        self.data[slot] = 0
+        self.scores[slot] = score
+        self.data[slot] = word
+
+    def Hashfull(self): # per mille of depth-preferred slots used this search, as UCI reports it
+        sample = self.data[:2000:2]
+        used = sum(1 for word in sample if word & USED_FLAG and (word >> AGE_SHIFT & AGE_MASK) == self.age)
+        return used * 1000 // len(sample)
@@ -0,0 +1,204 @@
+# UCI (Universal Chess Interface) front end so the AI can be run by standard chess GUIs and match harnesses
+#   python -m chesscore.uci
+# the search runs on its own thread so "stop" and "isready" are answered while it thinks
+import os
+import sys
+import threading
+from chesscore.bitboard import Position, START_FEN, MoveToUci
+from chesscore.engine import Engine
+from chesscore.players import AI, MAX_DEPTH, MATE_SCORE, MATE_BOUND
+from chesscore.timemanager import TimeManager
+from chesscore.smp import LazySmpSearch, RootSplitter
+from chesscore.transposition import DEFAULT_SIZE_MB
+
+ENGINE_NAME = "Chess NEA"
+ENGINE_AUTHOR = "William Pimentel"
+MAX_HASH_MB = 1024
+MAX_THREADS = os.cpu_count() or 1
+PARALLEL_MODES = ("LazySMP", "RootSplit") # how Threads > 1 is used, see smp.py
+
+def UciScore(evaluation, colour): # UCI scores are from the side to move's point of view, in centipawns
+    score = evaluation if colour == "w" else -evaluation
+    if abs(score) >= MATE_BOUND:
+        # mate scores count plies from the root (and come back from the table as floats)
+        movesToMate = int(MATE_SCORE - abs(score) + 1) // 2
+        return f"mate {movesToMate if score > 0 else -movesToMate}"
+    return f"cp {round(score * 100)}"
+
+class UciEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.outputLock = threading.Lock()
+        self.position = Position.FromFen(START_FEN)
+        self.engine = Engine(self.position)
+        self.ai = AI("w")
+        self.searchThread = None
+        self.infinite = False # "go infinite" - bestmove has to wait for "stop"
+        self.stopEvent = threading.Event()
+        self.processes = 1 # search processes, more than 1 uses parallelMode
+        self.parallelMode = PARALLEL_MODES[0]
+        self.rootSplitter = None # process pool, kept between searches once started
+
+    def Send(self, line):
+        with self.outputLock:
+            print(line, file=self.output, flush=True)
+
+    def HandleCommand(self, line): # returns False on quit
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+
+        if command == "uci":
+            self.Send(f"id name {ENGINE_NAME}")
+            self.Send(f"id author {ENGINE_AUTHOR}")
+            self.Send(f"option name Hash type spin default {DEFAULT_SIZE_MB} min 1 max {MAX_HASH_MB}")
+            self.Send(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            self.Send(f"option name ParallelMode type combo default {PARALLEL_MODES[0]} " + " ".join(f"var {mode}" for mode in PARALLEL_MODES))
+            self.Send("option name NullMove type check default true")
+            self.Send("option name LateMoveReductions type check default true")
+            self.Send("uciok")
+        elif command == "isready":
+            self.Send("readyok")
+        elif command == "ucinewgame":
+            self.Stop()
+            self.ai.transpositionTable.Clear()
+            if self.rootSplitter is not None:
+                self.rootSplitter.ClearTables()
+            self.position = Position.FromFen(START_FEN)
+        elif command == "setoption":
+            self.Stop()
+            self.SetOption(tokens[1:])
+        elif command == "position":
+            self.Stop()
+            self.SetPosition(tokens[1:])
+        elif command == "go":
+            self.Stop()
+            self.Go(tokens[1:])
+        elif command == "stop":
+            self.Stop()
+        elif command == "quit":
+            self.Stop()
+            return False
+        return True # unknown commands are ignored, as the protocol asks
+
+    def SetOption(self, tokens): # setoption name <name> value <value>
+        if "name" not in tokens or "value" not in tokens:
+            return
+        name = " ".join(tokens[tokens.index("name") + 1:tokens.index("value")]).lower()
+        value = " ".join(tokens[tokens.index("value") + 1:])
+        if name == "hash" and value.isdigit():
+            self.ai.transpositionTable.Resize(min(max(int(value), 1), MAX_HASH_MB))
+            if self.rootSplitter is not None:
+                self.rootSplitter.ResizeTables(self.ai.transpositionTable.sizeMb)
+        elif name == "threads" and value.isdigit(): # processes really, the usual UCI name for it
+            self.processes = min(max(int(value), 1), MAX_THREADS)
+        elif name == "parallelmode" and value in PARALLEL_MODES:
+            self.parallelMode = value
+        elif name == "nullmove":
+            self.ai.useNullMove = value.lower() == "true"
+        elif name == "latemovereductions":
+            self.ai.useLateMoveReductions = value.lower() == "true"
+
+    def SetPosition(self, tokens):
+        if tokens and tokens[0] == "startpos":
+            fen, rest = START_FEN, tokens[1:]
+        elif tokens and tokens[0] == "fen":
+            end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            fen, rest = " ".join(tokens[1:end]), tokens[end:]
+        else:
+            return
+        try:
+            position = Position.FromFen(fen)
+        except ValueError as error:
+            self.Send(f"info string {error}")
+            return
+
+        for name in rest[1:] if rest and rest[0] == "moves" else []:
+            move = next((move for move in self.engine.GetLegalMoves(position.turn, position) if MoveToUci(move) == name), None)
+            if move is None:
+                self.Send(f"info string illegal move {name}")
+                break
+            position.MakeMove(move)
+        self.position = position.CopyPosition() # drop the undo records of the moves played
+
+    def Go(self, tokens):
+        options = {}
+        for index, token in enumerate(tokens):
+            if (token in ("depth", "movetime", "wtime", "btime", "winc", "binc", "movestogo") and index + 1 < len(tokens)
+                    and tokens[index + 1].lstrip("-").isdigit()): # a clock can go negative when a GUI runs it out
+                options[token] = int(tokens[index + 1])
+
+        colour = self.position.turn
+        maxDepth = options.get("depth", MAX_DEPTH)
+        self.infinite = "infinite" in tokens
+        if self.infinite:
+            timeManager = TimeManager()
+        elif "movetime" in options:
+            timeManager = TimeManager(moveTime=options["movetime"] / 1000)
+        elif f"{colour}time" in options:
+            timeManager = TimeManager(options[f"{colour}time"] / 1000, options.get(f"{colour}inc", 0) / 1000,
+                                      options.get("movestogo"))
+        else: # e.g. "go depth 6"
+            timeManager = TimeManager()
+
+        self.ai.colour = colour
+        self.ai.stopRequested = False
+        self.stopEvent.clear()
+        self.searchThread = threading.Thread(target=self.Search, args=(self.position.CopyPosition(), timeManager, maxDepth))
+        self.searchThread.start()
+
+    def Search(self, position, timeManager, maxDepth):
+        def Report(depth, evaluation, nodes, seconds, principalVariation):
+            nps = int(nodes / seconds) if seconds > 0 else 0
+            pv = " ".join(MoveToUci(move) for move in principalVariation)
+            score = UciScore(evaluation, position.turn)
+            hashfull = self.ai.transpositionTable.Hashfull()
+            self.Send(f"info depth {depth} score {score} nodes {nodes} nps {nps} hashfull {hashfull} time {int(seconds * 1000)} pv {pv}")
+
+        self.ai.rootSplitter = None
+        if self.processes > 1 and self.parallelMode == "LazySMP":
+            bestMove = LazySmpSearch(self.ai, position, self.engine, self.processes, timeManager, maxDepth, Report)
+        else:
+            if self.processes > 1: # RootSplit
+                if (self.rootSplitter is None or self.rootSplitter.processes != self.processes
+                        or self.rootSplitter.useNullMove != self.ai.useNullMove
+                        or self.rootSplitter.useLateMoveReductions != self.ai.useLateMoveReductions):
+                    self.ShutdownPool()
+                    self.rootSplitter = RootSplitter(self.processes, self.ai.transpositionTable.sizeMb,
+                                                     self.ai.useNullMove, self.ai.useLateMoveReductions)
+                self.ai.rootSplitter = self.rootSplitter
+            bestMove = self.ai.ChooseMove(position, self.engine, timeManager, maxDepth, Report)
+        if bestMove is None: # stopped before depth 1 finished - any legal move beats none
+            moves = self.engine.GetLegalMoves(position.turn, position)
+            bestMove = moves[0] if moves else None
+        if self.infinite: # the search can run out of moves or depth first, but the GUI still has to say stop
+            self.stopEvent.wait()
+        self.Send(f"bestmove {MoveToUci(bestMove) if bestMove else '0000'}")
+
+    def ShutdownPool(self):
+        if self.rootSplitter is not None:
+            self.rootSplitter.Shutdown()
+            self.rootSplitter = None
+
+    def Stop(self):
+        if self.searchThread is not None:
+            self.stopEvent.set()
+            self.ai.Stop()
+            self.searchThread.join()
+            self.searchThread = None
+
+def main():
+    uci = UciEngine()
+    for line in sys.stdin:
+        if not uci.HandleCommand(line):
+            break
+    else: # input closed without "quit" - let a running search finish and report its move
+        if uci.searchThread is not None and not uci.infinite: # an infinite one would never finish
+            uci.searchThread.join()
+    uci.Stop()
+    uci.ShutdownPool()
+    uci.ai.transpositionTable.Unshare() # free the shared memory if Lazy SMP was used
+
+if __name__ == "__main__":
+    main()
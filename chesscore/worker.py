@@ -0,0 +1,52 @@
+# one long-lived thread that runs AI searches for the GUI
+# searches are queued as commands, run on their own copy of the position, and the result is handed to onResult
+# (from the worker thread - the GUI turns it into an event for its main loop) unless the search was stopped first
+import queue
+import threading
+
+class SearchWorker:
+    def __init__(self, onResult):
+        self.onResult = onResult # onResult(searchId, move)
+        self.commands = queue.Queue()
+        self.lock = threading.Lock() # guards the two fields below between the GUI and worker threads
+        self.currentAI = None
+        self.cancelledId = 0 # searches with this id or lower are abandoned
+        self.lastId = 0
+        self.thread = threading.Thread(target=self.Run, daemon=True)
+        self.thread.start()
+
+    def StartSearch(self, ai, board, engine, timeManager): # returns the id the result will be posted with
+        self.Stop()
+        self.lastId += 1
+        # copied here on the caller's thread so the search never reads the board the GUI is drawing
+        self.commands.put(("search", self.lastId, ai, board.CopyPosition(), engine, timeManager))
+        return self.lastId
+
+    def Stop(self): # abandon the running/queued search (e.g. undo, resign, reset) - its result is never posted
+        with self.lock:
+            self.cancelledId = self.lastId
+            if self.currentAI is not None:
+                self.currentAI.Stop()
+
+    def Shutdown(self):
+        self.Stop()
+        self.commands.put(("quit",))
+        self.thread.join()
+
+    def Run(self):
+        while True:
+            command = self.commands.get()
+            if command[0] == "quit":
+                return
+            _, searchId, ai, position, engine, timeManager = command
+            with self.lock:
+                if searchId <= self.cancelledId:
+                    continue
+                self.currentAI = ai
+                ai.stopRequested = False # cleared under the lock so a Stop from now on can't be lost
+            move = ai.ChooseMove(position, engine, timeManager)
+            with self.lock:
+                self.currentAI = None
+                cancelled = searchId <= self.cancelledId
+            if not cancelled:
+                self.onResult(searchId, move)
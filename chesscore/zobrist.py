@@ -0,0 +1,27 @@
+# Zobrist keys - a random 64 bit number for every piece on every square, the side to move,
+# each castling rights mask and each en passant file. A position's key is the XOR of the
+# keys for everything in it, so a move only needs a few XORs to update it (see Position)
+import random
+
+ZOBRIST_SEED = 20240101 # fixed so keys are the same every run
+
+generator = random.Random(ZOBRIST_SEED)
+PIECE_KEYS = {colour + pieceType: [generator.getrandbits(64) for square in range(64)]
+              for colour in ("w", "b") for pieceType in ("p", "n", "b", "r", "q", "k")}
+BLACK_TO_MOVE_KEY = generator.getrandbits(64)
+CASTLING_KEYS = [generator.getrandbits(64) for rights in range(16)] # indexed by the 4 bit rights mask
+EN_PASSANT_KEYS = [generator.getrandbits(64) for file in range(8)]
+CASTLING_KEYS[0] = 0 # no rights contributes nothing, same as an empty square
+
+# full recalculation - only needed after setting a position up by hand
+def ComputeKey(position):
+    key = 0
+    for square, code in enumerate(position.squares):
+        if code is not None:
+            key ^= PIECE_KEYS[code][square]
+    if position.turn == "b":
+        key ^= BLACK_TO_MOVE_KEY
+    key ^= CASTLING_KEYS[position.castlingRights]
+    if position.enPassantSquare is not None:
+        key ^= EN_PASSANT_KEYS[position.enPassantSquare & 7]
+    return key
@@ -1,10 +1,10 @@
 import pygame
-import copy
-import threading
-import math
-from heapq import heappush, heappop
-
-pygame.init()
+from chesscore.bitboard import COLOURS, PIECE_TYPES, START_FEN, SquarePosition
+from chesscore.board import Board, Move
+from chesscore.engine import Engine
+from chesscore.players import Human, AI
+from chesscore.timemanager import TimeManager
+from chesscore.worker import SearchWorker
 
 # region GLOBAL CONSTANTS
 ALPHABET = "abcdefgh" # for board coord rendering
@@ -13,6 +13,7 @@ SQUARE_SIZE = 100
 BOARD_SIZE = 8
 OFFSETS = (300, 100)
 WIDTH, HEIGHT = 1400, 1000
+AI_MOVE_EVENT = pygame.USEREVENT + 1 # posted by the search worker when the AI has picked a move
 
 # BUTTONS, TEXT, ETC
 PLAY_BUTTON_COLOR         = "#0b5a84"       # Home screen Play button
@@ -47,6 +48,14 @@ def BoardToScreen(position, offsets):
     screenY = offsets[1] + (7 - position[1]) * SQUARE_SIZE
     return (screenX, screenY)
 
+def LoadPieceSprites(): # one scaled sprite per piece code e.g. "wq", shared by every piece of that kind
+    sprites = {}
+    for colour in COLOURS:
+        for pieceType in PIECE_TYPES:
+            sprite = pygame.image.load(f'Pieces/{colour}{pieceType}.png').convert_alpha()
+            sprites[colour + pieceType] = pygame.transform.scale(sprite, (SQUARE_SIZE, SQUARE_SIZE))
+    return sprites
+
 # GUI CLASSES
 class Button:
     def __init__(self, x, y, width, height, colour):
@@ -239,8 +248,7 @@ class PlayerSetup(Screen):
         self.blackPlayerText.Draw(self.screen)
 
 class ChessGame(Screen):
-    def __init__(self, screen, board): # this might not get updated
-        self.board = board
+    def __init__(self, screen):
         self.coordText = []
         super().__init__(screen)
 
@@ -263,7 +271,7 @@ class ChessGame(Screen):
         super().Render()
 
         # Render board
-        self.board.Draw((300, 100))
+        self.DrawBoard((300, 100))
 
         # Render resign button
         self.resignButton.Draw(self.screen)
@@ -271,6 +279,16 @@ class ChessGame(Screen):
         # Render resign icon
         self.resignIcon.Render(self.screen)
 
+    def DrawBoard(self, offsets=OFFSETS):
+        offsetX, offsetY = offsets
+        for i in range(BOARD_SIZE):
+            for j in range(BOARD_SIZE):
+                colour = "#386F88" if (i + j) % 2 == 0 else "#CDDBE1"
+                rect = (offsetX + i * SQUARE_SIZE,
+                        offsetY + (BOARD_SIZE - 1 - j) * SQUARE_SIZE,
+                        SQUARE_SIZE, SQUARE_SIZE)
+                pygame.draw.rect(self.screen, colour, rect)
+
 class Settings(Screen):
     def __init__(self, screen):
         self.themeButtons = []
@@ -309,44 +327,6 @@ class Settings(Screen):
             button.Draw(self.screen)
 
 # LOGIC CLASSES
-class Move:
-    def __init__(self, startSquare, endSquare, board):
-        self.startRow, self.startCol = startSquare
-        self.endRow, self.endCol = endSquare
-        self.pieceMoved = board.GetPieceAt(startSquare)
-        self.pieceCaptured = board.GetPieceAt(endSquare)
-        # restore piece's moved state
-        self.pieceMovedWasMoved = self.pieceMoved.moved if self.pieceMoved is not None else None # set it equal to move state if there a piece
-        self.oldEnPassantTarget = board.enPassantTarget
-
-        # need to determine captured piece for en passant (the captured pawn is NOT on the end square)
-        self.isEnPassant = False
-        if self.pieceMoved and self.pieceMoved.type == "p" and endSquare == board.enPassantTarget: # conditions for detecting en passant
-            self.isEnPassant = True
-            direction = 1 if self.pieceMoved.colour == "w" else -1 # inverse directions relative to colour
-            capturedPosition = (endSquare[0], endSquare[1] - direction)
-            self.pieceCaptured = board.GetPieceAt(capturedPosition)
-        else: # if theres no en passant just log the enemy piece on the destination/end square
-            self.pieceCaptured = board.GetPieceAt(endSquare)
-
-        # check for castling
-        self.isCastling = False
-        self.rookStart = None # determines start pos of rook
-        self.rookEnd = None # determines end pos of rook
-        if self.pieceMoved and self.pieceMoved.type == "k" and abs(startSquare[0] - endSquare[0]) == 2: # conditions for detecting castling move
-            self.isCastling = True
-            # IF QUEENSIDE CASTLE
-            if endSquare[0] < startSquare[0]: # consider x-axis to determine what rook should be moved
-                self.rookStart = (0, startSquare[1]) # rook starts at x = 0 or x = 7
-                self.rookEnd = (endSquare[0] + 1, startSquare[1])
-            # IF KINGSIDE CASTLE
-            else:
-                self.rookStart = (7, startSquare[1])
-                self.rookEnd = (endSquare[0] - 1, startSquare[1])
-
-        # flag for pawn promotion
-        self.promoted = False
-
 class Timer:
     def __init__(self, timeSeconds):
         self.remaining = timeSeconds
@@ -370,536 +350,13 @@ class Timer:
     def GetTime(self):
         return max(0, self.remaining)
     
-class Board:
-    def __init__(self, screen, squareSize=SQUARE_SIZE, boardSize = BOARD_SIZE):
-        self.screen = screen
-        self.squareSize = squareSize
-        self.boardSize = boardSize
-        self.grid = {(x, y): None for x in range(boardSize) for y in range(boardSize)}
-        self.enPassantTarget = None
-
-    def __deepcopy__(self, memo):
-        cls = self.__class__
-        result = cls.__new__(cls)
-        memo[id(self)] = result
-        # Instead of copying the screen, we just assign the same reference.
-        result.screen = self.screen  
-        result.squareSize = self.squareSize
-        # Deepcopy the grid manually so that each Piece is copied (using our overridden __deepcopy__)
-        result.grid = {}
-        for key, piece in self.grid.items():
-            result.grid[key] = copy.deepcopy(piece, memo) if piece is not None else None
-        result.enPassantTarget = self.enPassantTarget
-        return result
-
-    def Draw(self, offsets=OFFSETS):
-        offsetX, offsetY = offsets
-        for i in range(self.boardSize):
-            for j in range(self.boardSize):
-                colour = "#386F88" if (i + j) % 2 == 0 else "#CDDBE1"
-                rect = (offsetX + i * self.squareSize,
-                        offsetY + (self.boardSize - 1 - j) * self.squareSize,
-                        self.squareSize, self.squareSize)
-                pygame.draw.rect(self.screen, colour, rect)
-
-    def PlacePiece(self, piece):
-        self.grid[piece.position] = piece
-
-    def MovePiece(self, piece, newPosition):
-        oldPosition = piece.position
-        
-        # en passant
-        if piece.type == "p" and newPosition == self.enPassantTarget:
-            direction = 1 if piece.colour == "w" else -1
-            capturedPosition = (newPosition[0], newPosition[1] - direction)
-            captured = self.GetPieceAt(capturedPosition)
-            if captured and captured.type == "p":
-                self.RemovePiece(captured)
-        self.grid[oldPosition] = None
-        piece.position = newPosition
-        self.grid[newPosition] = piece
-
-        # reset en passant target then set it for double pawn moves
-        self.enPassantTarget = None
-        if piece.type == "p" and abs(newPosition[1] - oldPosition[1]) == 2:
-            self.enPassantTarget = (newPosition[0], (newPosition[1] + oldPosition[1]) // 2)
-    
-    def RemovePiece(self, piece):
-        self.grid[piece.position] = None
-
-    def GetPieceAt(self, position):
-        return self.grid.get(position)
-    
-    def GetPieces(self, colour):
-        return [p for p in self.grid.values() if p is not None and p.colour == colour]
-
-class Piece:
-    def __init__(self, data, position, sprite):
-        self.colour = data[0]
-        self.type = data[1]
-        self.position = position
-        self.sprite = pygame.transform.scale(sprite, (SQUARE_SIZE, SQUARE_SIZE))
-        self.moved = False
-        self.castled = False
-
-    def __deepcopy__(self, memo):
-        cls = self.__class__
-        result = cls.__new__(cls)
-        memo[id(self)] = result
-        result.colour = self.colour
-        result.type = self.type
-        result.position = self.position  # immutable tuple, so it's safe to share
-        # Do not deepcopy the sprite; just share the reference
-        result.sprite = self.sprite
-        result.moved = self.moved
-        result.castled = self.castled
-        return result
-
-    def Render(self, screen, offsets=OFFSETS):
-        position = BoardToScreen(self.position, offsets)
-        screen.blit(self.sprite, position)
-
-    def CalculatePseudoLegalMoves(self, board):
-        x, y = self.position
-        moves = []
-        if self.type == "p":
-            direction = 1 if self.colour == "w" else -1
-            forward = (x, y + direction)
-            if board.GetPieceAt(forward) is None:
-                moves.append(forward)
-                # double pawn move
-                if not self.moved:
-                    doubleForward = (x, y + 2 * direction)
-                    if board.GetPieceAt(doubleForward) is None:
-                        moves.append(doubleForward)
-
-            enemyPiece = board.GetPieceAt((x - 1, y + direction)) # left
-            capturePosition = (x - 1, y + direction)
-            if (enemyPiece is not None and enemyPiece.colour != self.colour) or (capturePosition == board.enPassantTarget):
-                moves.append((x - 1, y + direction))
-            
-            enemyPiece = board.GetPieceAt((x + 1, y + direction)) # right
-            capturePosition = (x + 1, y + direction)
-            if enemyPiece is not None and enemyPiece.colour != self.colour or (capturePosition == board.enPassantTarget):
-                moves.append((x + 1, y + direction))
-
-        if self.type == "k":
-            directions = [(x, y + 1), (x + 1, y + 1), (x + 1, y), (x + 1, y - 1),
-                    (x, y - 1), (x - 1, y - 1), (x - 1, y), (x - 1, y + 1)]
-
-            for d in directions:
-                if board.GetPieceAt(d) == None or board.GetPieceAt(d).colour != self.colour: # if square empty or has enemy piece
-                    moves.append(d)
-
-            # Castling logic
-            if not self.moved: # if king hasnt moved
-                # left
-                left = []
-                invalid = False
-                for i in range(1, 5): # must start at 1
-                    if i != 4 and board.GetPieceAt((x - i, y)) is not None: # check if we are on last increment - we want the rook to be there
-                        invalid = True
-                        break
-                    left.append(board.GetPieceAt((x - i, y)))
-
-                if not invalid and left[-1] is not None:
-                    if left[-1].type == "r" and not left[-1].moved: # left[-1] is the rook; rook is always last
-                        moves.append((x - 2, y))
-                
-                # right
-                right = []
-                invalid = False
-                for i in range(1, 4):
-                    if i != 3 and board.GetPieceAt((x + i, y)) is not None:
-                        invalid = True
-                        break
-                    right.append(board.GetPieceAt((x + i, y)))
-                if not invalid and right[-1] is not None:
-                    if right[-1].type == "r" and not right[-1].moved: # right[-1] is the rook; rook is always last
-                        moves.append((x + 2, y))
-
-        if self.type == "n":
-            directions = [(x - 1, y + 2), (x + 1, y + 2), (x - 1, y - 2), (x + 1, y - 2),
-                (x + 2, y + 1), (x + 2, y - 1), (x - 2, y + 1), (x - 2, y - 1)]
-
-            for d in directions:
-                if board.GetPieceAt(d) == None or board.GetPieceAt(d).colour != self.colour:
-                    moves.append(d)
-
-        if self.type == "r":
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-            moves.extend(self.SlidingMoves(board, x, y, directions))
-
-        if self.type == "b":
-            directions = [(1, 1), (-1, 1), (1, -1), (-1, -1)]
-            
-            moves.extend(self.SlidingMoves(board, x, y, directions))
-
-        if self.type == "q":
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0),
-                          (1, 1), (-1, 1), (1, -1), (-1, -1)]
-
-            moves.extend(self.SlidingMoves(board, x, y, directions))
-
-        return [move for move in moves if 0 <= move[0] < BOARD_SIZE and 0 <= move[1] < BOARD_SIZE] # filter valid board positions based on limited range
-
-    def SlidingMoves(self, board, x, y, directions):
-        moves = []
-        for dx, dy in directions:
-            for i in range(1, BOARD_SIZE):
-                newPos = (x + dx * i, y + dy * i)
-                if not (0 <= newPos[0] < BOARD_SIZE and 0 <= newPos[1] < BOARD_SIZE):
-                    break
-                occupant = board.GetPieceAt(newPos)
-                if occupant is None:
-                    moves.append(newPos)
-                elif occupant.colour != self.colour:
-                    moves.append(newPos)
-                    break
-                else:
-                    break
-        return moves
-
-    def Promote(self, board): # only limited to queen for simulation simplicity + cba
-        self.type = "q" # change to queen
-        sprite = pygame.image.load(f"Pieces/{self.colour}q.png").convert_alpha() # setup queen sprite
-        self.sprite = pygame.transform.scale(sprite, (SQUARE_SIZE, SQUARE_SIZE))
-
-class Engine:
-    def __init__(self, board):
-        self.board = board
-        self.pieceValues = {"p": 1, "n": 3.2, "b": 3.3, "r": 5, "q": 9, "k": 20}
-    
-    def HashBoard(self, board):
-        boardState = []
-        for position in sorted(board.grid.keys()):
-            piece = board.grid[position]
-            if piece is not None:
-                boardState.append((position, piece.colour, piece.type, piece.moved))
-            else:
-                boardState.append((None, position))
-        boardState.append(("En Passant", board.enPassantTarget))
-        return hash(tuple(boardState))
-
-    def FindKingPosition(self, colour, board):
-        for position, piece in board.grid.items():
-            if piece and piece.colour == colour and piece.type == "k":
-                return position
-        return None
-    
-    def IsAttacking(self, enemyPiece, kingPosition, board):
-        return kingPosition in enemyPiece.CalculatePseudoLegalMoves(board)
-
-    def IsCheck(self, colour, board):
-        enemyColour = "w" if colour == "b" else "b"
-        kingPosition = self.FindKingPosition(colour, board)
-        for piece in board.GetPieces(enemyColour):
-            if kingPosition in piece.CalculatePseudoLegalMoves(board): # if king attacked by enemy
-                return True
-        return False
-    
-    def IsSquareAttacked(self, position, enemyColour, board): # different board state
-        for piece in board.GetPieces(enemyColour):
-            if position in piece.CalculatePseudoLegalMoves(board):
-                return True
-        return False
-
-    def CalculateLegalMoves(self, piece, board):
-        pseudoMoves = piece.CalculatePseudoLegalMoves(board)
-        legalMoves = []
-        savedEnPassant = board.enPassantTarget
-        enemyColour = "w" if piece.colour == "b" else "b"
-
-        for move in pseudoMoves:
-            # extra check for castling moves - king moving 2 squares to the left/right
-            # determine the square the king crosses (sequentially?)
-            if piece.type == "k" and abs(piece.position[0] - move[0]) == 2: # only need to observe the x-axis, this could be -2, use abs()
-                if self.IsCheck(piece.colour, board): # king cannot castle if in check
-                    continue
-                if move[0] > piece.position[0]:
-                    intermediate = (piece.position[0] + 1, piece.position[1]) # intermediate square (in between) depending on the direction of the castle
-                else:
-                    intermediate = (piece.position[0] - 1, piece.position[1])
-                if self.IsSquareAttacked(intermediate, enemyColour, board):
-                    continue
-
-            originalPosition = piece.position
-            captured = board.GetPieceAt(move)
-            capturedEnemyPiece = None
-
-            if piece.type == "p" and move == board.enPassantTarget:
-                direction = 1 if piece.colour == "w" else -1
-                capturedPosition = (move[0], move[1] - direction)
-                capturedEnemyPiece = board.GetPieceAt(capturedPosition)
-            board.MovePiece(piece, move)
-            if not self.IsCheck(piece.colour, board):
-                legalMoves.append(move)
-
-            # undo move
-            board.MovePiece(piece, originalPosition)
-            board.grid[move] = captured
-            if capturedEnemyPiece: # if theres a captured enemy piece
-                board.grid[capturedEnemyPiece.position] = capturedEnemyPiece
-            board.enPassantTarget = savedEnPassant
-        return legalMoves
-    
-    def IsCheckmate(self, colour, board):
-        if not self.IsCheck(colour, board):
-            return False
-        for piece in board.GetPieces(colour):
-            if self.CalculateLegalMoves(piece, board): # if theres a move
-                return False
-        return True
-
-    def IsStalemate(self, colour, board):
-        if self.IsCheck(colour, board):
-            return False
-        for piece in board.GetPieces(colour):
-            if self.CalculateLegalMoves(piece, board):
-                return False
-        return True
-        
-    def IsDraw(self, board): # cba for other cases for now so its going to be draw IIF 2 kings on the board
-        pieces = [piece for piece in board.grid.values() if piece is not None]
-        # if there are exactly 2 pieces and both are kings, thats a draw.
-        if len(pieces) == 2 and all(piece.type == "k" for piece in pieces):
-            return True
-
-    def PawnPromotionDistance(self, pawn, board):
-        direction = 1 if pawn.colour == "w" else -1
-        promotionRank = 7 if pawn.colour == "w" else 0
-        start = pawn.position
-
-        if start[1] == promotionRank:
-            return 0
-
-        heap = []
-        heappush(heap, (0, start))
-        bestCost = {start: 0}
-
-        while heap:
-            cost, position = heappop(heap)
-            if position[1] == promotionRank:
-                return cost
-            
-            forward = (position[0], position[1] + direction)
-            if 0 <= forward[1] < BOARD_SIZE and board.GetPieceAt(forward) is None:
-                newCost = cost + 1
-                if forward not in bestCost or newCost < bestCost[forward]:
-                    bestCost[forward] = newCost
-                    heappush(heap, (newCost, forward))
-
-            for dx in [-1, 1]:
-                diagonal = (position[0] + dx, position[1] + direction)
-                if 0 <= diagonal[0] < BOARD_SIZE and 0 <= diagonal[1] < BOARD_SIZE:
-                    piece = board.GetPieceAt(diagonal)
-                    if piece is not None and piece.colour != pawn.colour:
-                        newCost = cost + 1
-                        if diagonal not in bestCost or newCost < bestCost[diagonal]:
-                            bestCost[diagonal] = newCost
-                            heappush(heap, (newCost, diagonal))
-        return float("inf")
-
-    def Evaluate(self, board):
-        evaluation = 0
-        for piece in board.grid.values():
-            if piece is not None:
-                if piece.colour == "w":
-                    evaluation += self.pieceValues.get(piece.type, 0) # white maximises
-                else:
-                    evaluation -= self.pieceValues.get(piece.type, 0) # black minimises
-
-                if piece.type == "p":
-                    distance = self.PawnPromotionDistance(piece, board)
-                    if distance < float("inf"):
-                        bonus = 0.05 * math.log(max(8 - distance + 1, 1)) # diminishing bonus - punish pawn pushing to an extent
-                        if piece.colour == "w":
-                            evaluation += bonus
-                        else:
-                            evaluation -= bonus
-
-        boardClone = copy.deepcopy(board)
-        if self.IsCheckmate("w", boardClone):
-            return -float("inf")
-        if self.IsCheckmate("b", boardClone):
-            return float("inf")
-
-        return evaluation
-
-class Player:
-    def __init__(self, colour):
-        self.colour = colour
-
-class Human(Player):
-    def __init__(self, colour):
-        super().__init__(colour)
-    # human input handled by game loop
-
-class AI(Player):
-    def __init__(self, colour):
-        super().__init__(colour)
-        self.maxDepth = 2
-        self.transpositionTable = {} # board hash: (depth, eval)
-
-    def ChooseMove(self, game):
-        timer = game.timers[self.colour]
-        timeLimit = timer.GetTime() * 1000
-        startTime = pygame.time.get_ticks()
-
-        bestMove = None
-        depth = 1
-        while depth <= self.maxDepth:
-            if pygame.time.get_ticks() - startTime > timeLimit: # if over time limit, stop
-                break
-            currentBest = self.GetBestMove(game.board, game.engine, depth)
-            if currentBest is not None:
-                bestMove = currentBest
-            depth += 1
-        return bestMove
-
-    # generates all tuples in the form: (piece, legal move)
-    def GetAllLegalMovePairs(self, board, engine, colour):
-        legalMoves = []
-        for piece in board.GetPieces(colour):
-            moves = engine.CalculateLegalMoves(piece, board)
-            for move in moves:
-                legalMoves.append((piece, move))
-        return legalMoves
-
-    def FindPieceClone(self, boardClone, piece):
-        for p in boardClone.grid.values():
-            if p is not None and p.colour == piece.colour and p.type == piece.type and p.position == piece.position:
-                return p
-        return None
-
-    def OrderMoves(self, moves, board, engine):
-        scoredMoves = []
-        for piece, move in moves:
-            # check piece at the target square.
-            capturedPiece = board.GetPieceAt(move)
-            if capturedPiece is not None:
-                attackerValue = engine.pieceValues.get(piece.type, 0)
-                victimValue = engine.pieceValues.get(capturedPiece.type, 0)
-                score = victimValue - attackerValue
-            else:
-                score = 0
-            scoredMoves.append((score, (piece, move)))
-        
-        sortedMoves = self.MergeSort(scoredMoves)
-        return [movePair for score, movePair in sortedMoves]
-        
-    def MergeSort(self, array):
-        if len(array) <= 1:
-            return array
-        middle = len(array) // 2
-        left = self.MergeSort(array[:middle])
-        right = self.MergeSort(array[middle:])  # Corrected slice for the right half.
-        return self.Merge(left, right)
-
-    def Merge(self, left, right):
-        result = []
-        i = j = 0
-        while i < len(left) and j < len(right):
-            # For descending order, compare scores.
-            if left[i][0] >= right[j][0]:
-                result.append(left[i])
-                i += 1
-            else:
-                result.append(right[j])
-                j += 1
-        result.extend(left[i:])
-        result.extend(right[j:])
-        return result
-
-    def Minimax(self, board, engine, depth, alpha, beta, isMaximising, colour):
-        boardKey = engine.HashBoard(board)
-        if boardKey in self.transpositionTable:
-            storedDepth, storedEvaluation = self.transpositionTable[boardKey]
-            if storedDepth >= depth:
-                return storedEvaluation
-
-        if depth == 0:
-            evaluation = engine.Evaluate(board)
-            self.transpositionTable[boardKey] = (depth, evaluation)
-            return engine.Evaluate(board)
-
-        moves = self.OrderMoves(self.GetAllLegalMovePairs(board, engine, colour), board, engine)
-        if not moves:
-            return engine.Evaluate(board)
-
-        if isMaximising:
-            maxEval = -float("inf")
-            for piece, move in moves:
-                boardClone = copy.deepcopy(board)
-                pieceClone = self.FindPieceClone(boardClone, piece)
-                if pieceClone is None:
-                    continue
-                boardClone.MovePiece(pieceClone, move)
-                nextColour = "w" if colour == "b" else "b"
-                evaluation = self.Minimax(boardClone, engine, depth - 1, alpha, beta, False, nextColour)
-                maxEval = max(maxEval, evaluation)
-                alpha = max(alpha, evaluation)
-                if beta <= alpha:
-                    break
-            self.transpositionTable[boardKey] = (depth, maxEval)
-            return maxEval
-        else:
-            minEval = float("inf")
-            for piece, move in moves:
-                boardClone = copy.deepcopy(board)
-                pieceClone = self.FindPieceClone(boardClone, piece)
-                if pieceClone is None:
-                    continue
-                boardClone.MovePiece(pieceClone, move)
-                nextColour = "w" if colour == "b" else "b"
-                evaluation = self.Minimax(boardClone, engine, depth - 1, alpha, beta, True, nextColour)
-                minEval = min(minEval, evaluation)
-                beta = min(beta, evaluation)
-                if beta <= alpha:
-                    break
-            self.transpositionTable[boardKey] = (depth, minEval)
-            return minEval
-
-    def GetBestMove(self, board, engine, depth):
-        #self.transpositionTable.clear() - remove if good RAM - TEST
-        moves = self.GetAllLegalMovePairs(board, engine, self.colour)
-        if not moves:
-            return None
-        bestMove = None
-        if self.colour == "w":
-            bestEval = -float("inf")
-            for piece, move in moves:
-                boardClone = copy.deepcopy(board)
-                pieceClone = self.FindPieceClone(boardClone, piece)
-                if pieceClone is None:
-                    continue
-                boardClone.MovePiece(pieceClone, move)
-                # blacks move next turn
-                evaluation = self.Minimax(boardClone, engine, depth - 1, -float("inf"), float("inf"), False, "b") # minimising
-                if evaluation > bestEval:
-                    bestEval = evaluation
-                    bestMove = (piece, move)
-        else:
-            bestEval = float("inf")
-            for piece, move in moves:
-                boardClone = copy.deepcopy(board)
-                pieceClone = self.FindPieceClone(boardClone, piece)
-                if pieceClone is None:
-                    continue
-                boardClone.MovePiece(pieceClone, move)
-                # whites move next turn
-                evaluation = self.Minimax(boardClone, engine, depth - 1, -float("inf"), float("inf"), True, "w") # maximising
-                if evaluation < bestEval:
-                    bestEval = evaluation
-                    bestMove = (piece, move)
-        return bestMove
-
 # GAME CONTROLLER
 class Game:
     def __init__(self, screen):
         self.screen = screen
-        self.board = Board(screen, SQUARE_SIZE, BOARD_SIZE)
+        self.board = Board()
         self.engine = Engine(self.board)
+        self.pieceSprites = LoadPieceSprites()
         self.moveLog = []
         self.historyIndex = -1
         self.selectedPiece = None
@@ -913,12 +370,14 @@ class Game:
         self.gameOver = False
         self.gameOverMessage = ""
         self.positionCount = {}
+        self.searchWorker = SearchWorker(self.PostAIMove)
+        self.pendingSearch = None # id of the search whose move we are waiting for
 
         # GUI Screens
         self.mainMenu = Home(screen)
         self.gameSetupTime = TimeSetup(screen)
         self.gameSetupPlayer = PlayerSetup(screen)
-        self.chessGameScreen = ChessGame(screen, self.board)
+        self.chessGameScreen = ChessGame(screen)
         self.gameSettings = Settings(screen)
         self.currentScreen = self.mainMenu  # start at the main menu
 
@@ -926,23 +385,8 @@ class Game:
         self.running = True
 
     def SetupPieces(self):
-        generalOrder = ["r", "n", "b", "q", "k", "b", "n", "r"]
-        whitePositions = [(i, 0) for i in range(8)] + [(i, 1) for i in range(8)]
-        blackPositions = [(i, 7) for i in range(8)] + [(i, 6) for i in range(8)]
-
-        for position in whitePositions:
-            pieceType = generalOrder[position[0]] if position[1] == 0 else "p"
-            data = "w" + pieceType
-            sprite = pygame.image.load(f'Pieces/{data}.png').convert_alpha()
-            piece = Piece(data, position, sprite)
-            self.board.PlacePiece(piece)
-
-        for position in blackPositions:
-            pieceType = generalOrder[position[0]] if position[1] == 7 else "p"
-            data = "b" + pieceType
-            sprite = pygame.image.load(f'Pieces/{data}.png').convert_alpha()
-            piece = Piece(data, position, sprite)
-            self.board.PlacePiece(piece)
+        self.board.SetFen(START_FEN)
+        self.currentTurn = self.board.turn
 
     def CurrentPlayerIsHuman(self):
         return isinstance(self.players[self.currentTurn], Human)
@@ -962,30 +406,17 @@ class Game:
             self.validMoves = []
             self.highlightedSquares = []
 
-    def MakeMove(self, piece, destination):
+    def MakeMove(self, piece, destination, promotion=None):
         # if moves were undone, discard "redo" moves.
         if self.historyIndex < len(self.moveLog) - 1:
             self.moveLog = self.moveLog[:self.historyIndex + 1]
         startSquare = piece.position
-        move = Move(startSquare, destination, self.board)
+        move = Move(startSquare, destination, self.board, promotion)
         self.moveLog.append(move)
         self.historyIndex += 1
 
-        # execute move
-        self.board.MovePiece(piece, destination)
-        piece.moved = True
-
-        # handle castling
-        if move.isCastling:
-            rook = self.board.GetPieceAt(move.rookStart)
-            if rook:
-                self.board.MovePiece(rook, move.rookEnd)
-                rook.moved = True
-
-        # handle pawn promotion
-        if piece.type == "p" and ((piece.colour == "w" and destination[1] == 7) or (piece.colour == "b" and destination[1] == 0)):
-            piece.Promote(self.board)
-            move.promoted = True
+        # execute move - castling, en passant and promotion are all handled by the board
+        self.board.MakeMove(move.move)
 
         # update the repetition counter
         boardStateHash = self.engine.HashBoard(self.board)
@@ -1007,50 +438,20 @@ class Game:
 
     def UndoMove(self):
         if self.historyIndex >= 0: # if the move log is not empty, then theres no move to undo duhh
-            move = self.moveLog[self.historyIndex]
-            piece = move.pieceMoved # retrieve piece object
-
-            # move the piece back
-            self.board.grid[(move.endRow, move.endCol)] = None
-            piece.position = (move.startRow, move.startCol)
-            self.board.grid[(move.startRow, move.startCol)] = piece
-            piece.moved = move.pieceMovedWasMoved
-            if move.promoted:
-                piece.type = "p"
-                sprite = pygame.image.load(f"Pieces/{piece.colour}p.png").convert_alpha()
-                piece.sprite = pygame.transform.scale(sprite, (SQUARE_SIZE, SQUARE_SIZE))
-
-            # restore captured piece
-            if move.pieceCaptured is not None:
-                if move.isEnPassant:
-                    direction = 1 if piece.colour == "w" else -1
-                    capturedPosition = (move.endRow, move.endCol - direction)
-                else:
-                    capturedPosition = (move.endRow, move.endCol)
-                move.pieceCaptured.position = capturedPosition
-                self.board.grid[capturedPosition] = move.pieceCaptured
-
-            # undo castling
-            if move.isCastling:
-                rook = self.board.GetPieceAt(move.rookEnd)
-                if rook:
-                    self.board.grid[move.rookEnd] = None
-                    rook.position = move.rookStart
-                    self.board.grid[move.rookStart] = rook
-                    rook.moved = False
-            
-            # restore en passant target
-            self.board.enPassantTarget = move.oldEnPassantTarget
-
-            # revert turn
-            self.currentTurn = "w" if self.currentTurn == "b" else "b"
-
-            # decrement repetition count for the state after undoing
+            # decrement repetition count for the position we are leaving
             boardStateHash = self.engine.HashBoard(self.board)
             if boardStateHash in self.positionCount:
                 self.positionCount[boardStateHash] -= 1
+
+            self.CancelAISearch() # its move was for the position we are leaving
+
+            # the board's undo record restores captures, castling rooks, en passant and promotions
+            self.board.UnmakeMove()
             self.historyIndex -= 1
 
+            # revert turn
+            self.currentTurn = "w" if self.currentTurn == "b" else "b"
+
             # clear selection
             self.selectedPiece = None
             self.validMoves = []
@@ -1060,42 +461,10 @@ class Game:
 
     def RedoMove(self):
         if self.historyIndex < len(self.moveLog) - 1:
+            self.CancelAISearch()
             self.historyIndex += 1
             move = self.moveLog[self.historyIndex]
-            piece = move.pieceMoved
-
-            if move.pieceCaptured is not None and move.isEnPassant:
-                self.board.grid[(move.endRow, move.endCol)] = None
-
-            # move capturing piece forward
-            self.board.grid[(move.startRow, move.startCol)] = None
-            piece.position = (move.endRow, move.endCol)
-            self.board.grid[(move.endRow, move.endCol)] = piece
-            piece.moved = True
-
-            # for en passant, remove captured pawn
-            if move.pieceCaptured is not None and move.isEnPassant:
-                direction = 1 if piece.colour == "w" else -1
-                capturedPosition = (move.endRow, move.endCol - direction)
-                self.board.grid[capturedPosition] = None
-
-            # redo castling - update rook
-            if move.isCastling:
-                rook = self.board.GetPieceAt(move.rookStart)
-                if rook:
-                    self.board.grid[move.rookStart] = None
-                    rook.position = move.rookEnd
-                    self.board.grid[move.rookEnd] = rook
-                    rook.moved = True
-
-            # redo pawn promotion
-            if move.promoted:
-                piece.Promote(self.board)
-
-            # update en passant target
-            self.board.enPassantTarget = None
-            if piece.type == "p" and abs(move.endRow - move.startRow) == 2:
-                self.board.enPassantTarget = (move.endRow, (move.endRow + move.startRow) // 2)
+            self.board.MakeMove(move.move)
 
             # redo turn
             self.currentTurn = "w" if self.currentTurn == "b" else "b"
@@ -1219,19 +588,35 @@ class Game:
                         self.selectedPiece = None
                         self.validMoves = []
 
+            if event.type == AI_MOVE_EVENT:
+                self.ApplyAIMove(event.searchId, event.move)
+
             if self.inGame and event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_LEFT:
                     self.UndoMove()
                 if event.key == pygame.K_RIGHT:
                     self.RedoMove()
 
-    def ComputeAIMove(self):
-        AIMove = self.players[self.currentTurn].ChooseMove(self)
-        if AIMove:
-            piece, move = AIMove
-            self.MakeMove(piece, move)
+    def StartAISearch(self):
+        timeManager = TimeManager(self.timers[self.currentTurn].GetTime()) # budget from what is left on our clock
+        self.pendingSearch = self.searchWorker.StartSearch(self.players[self.currentTurn], self.board, self.engine, timeManager)
+
+    def PostAIMove(self, searchId, move): # runs on the worker thread - hand the move over to the main loop
+        pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, searchId=searchId, move=move))
+
+    def ApplyAIMove(self, searchId, move):
+        if searchId != self.pendingSearch or self.gameOver: # stale result from a search we moved on from
+            return
+        self.pendingSearch = None
+        if move:
+            fromSquare, toSquare, promotion = move
+            self.MakeMove(self.board.pieces[fromSquare], SquarePosition(toSquare), promotion)
             self.disableAI = True
 
+    def CancelAISearch(self):
+        self.searchWorker.Stop()
+        self.pendingSearch = None
+
     def Update(self):
         if self.timers[self.currentTurn].GetTime() <= 0:
             self.gameOver = True
@@ -1239,6 +624,8 @@ class Game:
         if self.gameOver:
             self.timers["w"].running = False
             self.timers["b"].running = False
+            if self.pendingSearch is not None:
+                self.CancelAISearch()
             return
 
         if self.inGame:
@@ -1266,7 +653,7 @@ class Game:
 
         if self.inGame and not self.disableAI and not self.CurrentPlayerIsHuman():
             self.disableAI = True
-            threading.Thread(target=self.ComputeAIMove).start()
+            self.StartAISearch()
 
     def Render(self):
         self.currentScreen.Render()
@@ -1315,9 +702,9 @@ class Game:
                 self.screen.blit(highlight, position)
 
             # render all pieces
-            for piece in self.board.grid.values():
+            for piece in self.board.pieces:
                 if piece:
-                    piece.Render(self.screen, self.offsets)
+                    self.screen.blit(self.pieceSprites[piece.colour + piece.type], BoardToScreen(piece.position, self.offsets))
 
             # render game over message if applicable
             if self.gameOver:
@@ -1341,8 +728,10 @@ class Game:
         pygame.display.flip()
 
     def ResetGame(self):
+        self.CancelAISearch() # resign/new game - don't let the old search keep running
+
         # reinitialise the board and engine
-        self.board = Board(self.screen, SQUARE_SIZE, BOARD_SIZE)
+        self.board = Board()
         self.engine = Engine(self.board)
 
         # reset move log and game state variables
@@ -1361,6 +750,7 @@ class Game:
         self.timers["b"].Reset(300)
 
 def main():
+    pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("notchess.com - now with interfaces")
     clock = pygame.time.Clock()
@@ -1371,9 +761,11 @@ def main():
         game.Update()
         game.Render()
         clock.tick(60)
+    game.searchWorker.Shutdown()
     pygame.quit()
 
-main()
+if __name__ == "__main__":
+    main()
 
 ## FLAWS
 # board does not get cleared after a game is complete